@@ -370,6 +370,10 @@ Based on this reasoning, provide a clear answer to the user."""
         stats['feedback'] = self.feedback.get_insights()
         
         return stats
+    
+    def close(self):
+        """Release resources held by the agent's components"""
+        self.feedback.close()
 
 
 class AgentSession:
@@ -469,3 +473,5 @@ if __name__ == '__main__':
     
     print("\nAgent Stats:")
     print(json.dumps(agent.get_stats(), indent=2, default=str))
+    
+    agent.close()
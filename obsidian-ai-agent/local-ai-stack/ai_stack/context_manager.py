@@ -9,16 +9,23 @@ Optimizes token usage and manages context window efficiently:
 - Dynamic context injection
 """
 
+import bisect
+import heapq
+import itertools
 import json
 import logging
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Iterator, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import re
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('context_manager')
 
+# Sentence boundary: whitespace following terminal punctuation
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+
 
 class Tokenizer:
     """Simple tokenizer for counting tokens"""
@@ -34,10 +41,17 @@ class Tokenizer:
     @classmethod
     def truncate(cls, text: str, max_tokens: int) -> str:
         """Truncate text to fit within token limit"""
+        return cls.truncate_with_count(text, max_tokens)[0]
+    
+    @classmethod
+    def truncate_with_count(cls, text: str, max_tokens: int) -> Tuple[str, int]:
+        """Truncate text and return it with its token count, without a recount"""
         max_chars = max_tokens * cls.CHARS_PER_TOKEN
         if len(text) <= max_chars:
-            return text
-        return text[:max_chars - 3] + "..."
+            return text, max(1, len(text) // cls.CHARS_PER_TOKEN)
+        
+        truncated = text[:max_chars - 3] + "..."
+        return truncated, max(1, len(truncated) // cls.CHARS_PER_TOKEN)
 
 
 class ContextPriority(Enum):
@@ -47,7 +61,7 @@ class ContextPriority(Enum):
     LOW = 1         # Older context, supplementary info
 
 
-@dataclass
+@dataclass(slots=True)
 class ContextChunk:
     """A chunk of context with metadata"""
     content: str
@@ -70,58 +84,93 @@ class SlidingWindowManager:
     def __init__(self, max_tokens: int = 4000, overlap_tokens: int = 200):
         self.max_tokens = max_tokens
         self.overlap_tokens = overlap_tokens
-        self.chunks: List[ContextChunk] = []
         self.total_tokens = 0
-    
-    def add(self, content: str, source: str, priority: ContextPriority = ContextPriority.MEDIUM):
-        """Add a new chunk to the window"""
-        chunk = ContextChunk(
-            content=content,
-            priority=priority,
-            source=source
-        )
         
-        self.chunks.append(chunk)
+        # Eviction order: min-heap of (priority, timestamp, seq); live chunks
+        # are keyed by seq, so the same chunk object can be added twice.
+        # Entries whose chunk is no longer live are discarded lazily on pop.
+        self._heap: List[Tuple[int, float, int]] = []
+        # Insertion-ordered buffer: O(1) append and O(1) eviction from any
+        # position, iterated in arrival order without copying
+        self._live: Dict[int, ContextChunk] = {}
+        # Output order for get_context: (-priority, timestamp, seq, chunk),
+        # kept sorted on add/evict so reads are a linear scan
+        self._ordered: List[Tuple[int, float, int, ContextChunk]] = []
+        self._seq = itertools.count()
+    
+    def __len__(self) -> int:
+        return len(self._live)
+    
+    @property
+    def chunks(self) -> List[ContextChunk]:
+        """Live chunks in insertion order"""
+        return list(self._live.values())
+    
+    def add(self, content: Union[str, ContextChunk], source: str = "",
+            priority: ContextPriority = ContextPriority.MEDIUM,
+            metadata: Optional[Dict[str, Any]] = None, prune: bool = True):
+        """
+        Add a new chunk to the window
+        Accepts raw content or a pre-built ContextChunk, whose token_count
+        is trusted as-is. Pass prune=False to batch several adds and call
+        _prune() once afterwards.
+        """
+        if isinstance(content, ContextChunk):
+            chunk = content
+        else:
+            chunk = ContextChunk(content=content, priority=priority, source=source,
+                                 metadata=metadata or {})
+        
+        seq = next(self._seq)
+        self._live[seq] = chunk
+        heapq.heappush(self._heap, (chunk.priority.value, chunk.timestamp, seq))
+        bisect.insort(self._ordered, (-chunk.priority.value, chunk.timestamp, seq, chunk))
         self.total_tokens += chunk.token_count
         
         # Prune if over budget
-        self._prune()
+        if prune:
+            self._prune()
     
     def _prune(self):
         """Remove low-priority chunks to fit within token budget"""
-        while self.total_tokens > self.max_tokens and len(self.chunks) > 1:
-            # Find lowest priority chunk
-            lowest_priority = min(self.chunks, key=lambda c: (c.priority.value, c.timestamp))
+        # Common case: under budget after an add, nothing to evict
+        if self.total_tokens <= self.max_tokens:
+            return
+        
+        heap = self._heap
+        while self.total_tokens > self.max_tokens and len(self._live) > 1:
+            # Drop stale entries until the top of the heap is a live chunk
+            while heap[0][2] not in self._live:
+                heapq.heappop(heap)
+            lowest_priority = self._live[heap[0][2]]
             
             # If it's critical, we have a problem
             if lowest_priority.priority == ContextPriority.CRITICAL:
                 # Truncate instead of remove
                 excess = self.total_tokens - self.max_tokens
-                lowest_priority.content = Tokenizer.truncate(
+                old_count = lowest_priority.token_count
+                lowest_priority.content, lowest_priority.token_count = Tokenizer.truncate_with_count(
                     lowest_priority.content, 
-                    lowest_priority.token_count - excess
+                    old_count - excess
                 )
-                lowest_priority.token_count = Tokenizer.count(lowest_priority.content)
+                self.total_tokens += lowest_priority.token_count - old_count
                 break
             
+            priority, timestamp, seq = heapq.heappop(heap)
+            del self._live[seq]
+            del self._ordered[bisect.bisect_left(self._ordered, (-priority, timestamp, seq))]
             self.total_tokens -= lowest_priority.token_count
-            self.chunks.remove(lowest_priority)
     
     def get_context(self) -> str:
         """Get current context as a single string"""
-        # Sort by priority (high to low) then timestamp
-        sorted_chunks = sorted(
-            self.chunks,
-            key=lambda c: (-c.priority.value, c.timestamp)
-        )
-        
-        return "\n\n".join([c.content for c in sorted_chunks])
+        # Already ordered by priority (high to low) then timestamp
+        return "\n\n".join([entry[3].content for entry in self._ordered])
     
     def get_messages_format(self) -> List[Dict[str, str]]:
         """Get context in chat message format"""
         messages = []
         
-        for chunk in self.chunks:
+        for chunk in self._live.values():
             role = chunk.metadata.get('role', 'system')
             messages.append({
                 'role': role,
@@ -139,17 +188,16 @@ class HierarchicalSummarizer:
     - Level 2: Summary of summaries
     """
     
-    def __init__(self, llm_client=None):
+    def __init__(self, llm_client=None, max_workers: int = 4):
         self.llm = llm_client
+        self.max_workers = max_workers
         self.levels: Dict[int, List[ContextChunk]] = {}
     
     def add_document(self, doc_id: str, content: str, chunk_size: int = 1000):
         """Add a document and create hierarchical summary"""
-        # Split into chunks
-        chunks = self._split_into_chunks(content, chunk_size)
-        
+        # Split into chunks lazily
         level_0 = []
-        for i, chunk_text in enumerate(chunks):
+        for i, chunk_text in enumerate(self._split_into_chunks(content, chunk_size)):
             chunk = ContextChunk(
                 content=chunk_text,
                 priority=ContextPriority.MEDIUM,
@@ -163,28 +211,33 @@ class HierarchicalSummarizer:
         # Create higher levels
         self._build_hierarchy()
     
-    def _split_into_chunks(self, text: str, chunk_size: int) -> List[str]:
-        """Split text into chunks with sentence boundaries"""
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        chunks = []
-        current_chunk = []
-        current_size = 0
+    def _split_into_chunks(self, text: str, chunk_size: int) -> Iterator[str]:
+        """
+        Split text into chunks with sentence boundaries
+        Yields slices of the original text, so no per-sentence copies are made
+        """
+        chunk_start = 0      # offset of the first sentence in the current chunk
+        chunk_end = 0        # end offset of the last sentence in the current chunk
+        current_size = 0     # summed sentence lengths, excluding the whitespace between
+        sentence_start = 0
+        has_sentence = False
         
-        for sentence in sentences:
-            sentence_size = len(sentence)
+        for match in itertools.chain(_SENT_RE.finditer(text), (None,)):
+            sentence_end = match.start() if match else len(text)
+            sentence_size = sentence_end - sentence_start
             
-            if current_size + sentence_size > chunk_size and current_chunk:
-                chunks.append(' '.join(current_chunk))
-                current_chunk = [sentence]
-                current_size = sentence_size
-            else:
-                current_chunk.append(sentence)
-                current_size += sentence_size
-        
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+            if current_size + sentence_size > chunk_size and has_sentence:
+                yield text[chunk_start:chunk_end]
+                chunk_start = sentence_start
+                current_size = 0
+            
+            chunk_end = sentence_end
+            current_size += sentence_size
+            has_sentence = True
+            if match:
+                sentence_start = match.end()
         
-        return chunks
+        yield text[chunk_start:chunk_end]
     
     def _build_hierarchy(self):
         """Build summary hierarchy"""
@@ -196,19 +249,28 @@ class HierarchicalSummarizer:
             
             # Group chunks and summarize
             group_size = 3  # Summarize 3 chunks at a time
-            for i in range(0, len(current_chunks), group_size):
-                group = current_chunks[i:i+group_size]
-                combined = "\n\n".join([c.content for c in group])
-                
-                summary = self._summarize(combined, max_length=200)
-                
+            groups = [
+                current_chunks[i:i+group_size]
+                for i in range(0, len(current_chunks), group_size)
+            ]
+            summaries = self._summarize_all(
+                ["\n\n".join([c.content for c in group]) for group in groups]
+            )
+            priority = ContextPriority(
+                max(ContextPriority.LOW.value, current_chunks[0].priority.value - 1)
+            )
+            
+            for group_idx, (group, summary) in enumerate(zip(groups, summaries)):
                 chunk = ContextChunk(
                     content=summary,
-                    priority=ContextPriority(current_chunks[0].priority.value - 1),
-                    source=f"summary:level:{current_level+1}:group:{i//group_size}",
+                    priority=priority,
+                    source=f"summary:level:{current_level+1}:group:{group_idx}",
                     metadata={
                         'level': current_level + 1,
-                        'source_chunks': [c.metadata.get('chunk_idx', i) for c in group]
+                        'source_chunks': [
+                            c.metadata.get('chunk_idx', group_idx * group_size)
+                            for c in group
+                        ]
                     }
                 )
                 next_level_chunks.append(chunk)
@@ -216,6 +278,17 @@ class HierarchicalSummarizer:
             self.levels[current_level + 1] = next_level_chunks
             current_level += 1
     
+    def _summarize_all(self, texts: List[str], max_length: int = 200) -> List[str]:
+        """
+        Summarize a level's groups
+        LLM calls are I/O-bound round-trips, so they run concurrently
+        """
+        if not self.llm or len(texts) <= 1:
+            return [self._summarize(text, max_length) for text in texts]
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(texts))) as executor:
+            return list(executor.map(lambda text: self._summarize(text, max_length), texts))
+    
     def _summarize(self, text: str, max_length: int = 200) -> str:
         """Summarize text"""
         if self.llm:
@@ -223,7 +296,7 @@ class HierarchicalSummarizer:
             return self.llm.chat([{"role": "user", "content": prompt}])
         
         # Fallback: extract first and last sentences
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENT_RE.split(text)
         if len(sentences) <= 2:
             return text
         return sentences[0] + " " + sentences[-1]
@@ -245,16 +318,13 @@ class HierarchicalSummarizer:
             if total_tokens <= token_budget:
                 return "\n\n".join([c.content for c in chunks])
         
-        # If nothing fits, truncate highest level
+        # If nothing fits, take the longest prefix of the highest level whose
+        # cached token counts fit: prefix sums + binary search for the cutoff
         chunks = self.levels[max(self.levels.keys())]
-        result = ""
-        for chunk in chunks:
-            if Tokenizer.count(result) + chunk.token_count <= token_budget:
-                result += chunk.content + "\n\n"
-            else:
-                break
+        cumulative = list(itertools.accumulate(c.token_count for c in chunks))
+        cut = bisect.bisect_right(cumulative, token_budget)
         
-        return result.strip()
+        return "\n\n".join([c.content for c in chunks[:cut]]).strip()
 
 
 class ContextInjector:
@@ -267,23 +337,34 @@ class ContextInjector:
         self.injection_rules: List[Dict] = []
     
     def add_rule(self, pattern: str, context: str, priority: ContextPriority = ContextPriority.HIGH):
-        """Add an injection rule"""
-        self.injection_rules.append({
-            'pattern': re.compile(pattern, re.IGNORECASE),
-            'context': context,
-            'priority': priority
-        })
+        """Add an injection rule, keeping rules ordered by descending priority"""
+        bisect.insort(
+            self.injection_rules,
+            {
+                'pattern': re.compile(pattern, re.IGNORECASE),
+                'context': context,
+                'priority': priority
+            },
+            key=lambda rule: -rule['priority'].value
+        )
     
     def inject(self, query: str, base_context: str, max_tokens: int = 1000) -> str:
         """
         Inject relevant context based on query
         """
-        injected_contexts = []
+        # Rules are pre-sorted, so matches come out in priority order
+        matched = [
+            (rule['context'], rule['priority'])
+            for rule in self.injection_rules
+            if rule['pattern'].search(query)
+        ]
         
-        # Check rules
-        for rule in self.injection_rules:
-            if rule['pattern'].search(query):
-                injected_contexts.append((rule['context'], rule['priority']))
+        # Retrieved context is MEDIUM: it goes after rules of the same or
+        # higher priority and before lower-priority rules
+        split = 0
+        while split < len(matched) and matched[split][1].value >= ContextPriority.MEDIUM.value:
+            split += 1
+        injected_contexts = matched[:split]
         
         # Retrieve relevant context if retriever available
         if self.retriever:
@@ -291,8 +372,7 @@ class ContextInjector:
             for item in retrieved:
                 injected_contexts.append((item.content, ContextPriority.MEDIUM))
         
-        # Sort by priority
-        injected_contexts.sort(key=lambda x: x[1].value, reverse=True)
+        injected_contexts.extend(matched[split:])
         
         # Build final context within token budget
         result_parts = []
@@ -354,16 +434,14 @@ class SmartContextBuilder:
         )
         
         # Truncate if needed
-        if chunk.token_count > self.budget['conversation'] // 4:
-            chunk.content = Tokenizer.truncate(
-                chunk.content, 
-                self.budget['conversation'] // 4
+        max_message_tokens = self.budget['conversation'] // 4
+        if chunk.token_count > max_message_tokens:
+            chunk.content, chunk.token_count = Tokenizer.truncate_with_count(
+                chunk.content,
+                max_message_tokens
             )
-            chunk.token_count = Tokenizer.count(chunk.content)
         
-        self.sliding_window.chunks.append(chunk)
-        self.sliding_window.total_tokens += chunk.token_count
-        self.sliding_window._prune()
+        self.sliding_window.add(chunk)
     
     def add_retrieved_context(self, documents: List[Dict]):
         """Add retrieved documents to context"""
@@ -371,15 +449,13 @@ class SmartContextBuilder:
             content = doc.get('content', '')
             source = doc.get('source', 'retrieval')
             
-            chunk = ContextChunk(
-                content=f"[{source}]\n{content}",
-                priority=ContextPriority.MEDIUM,
+            self.sliding_window.add(
+                f"[{source}]\n{content}",
                 source=source,
-                metadata={'doc_id': doc.get('id', 'unknown')}
+                priority=ContextPriority.MEDIUM,
+                metadata={'doc_id': doc.get('id', 'unknown')},
+                prune=False
             )
-            
-            self.sliding_window.chunks.append(chunk)
-            self.sliding_window.total_tokens += chunk.token_count
         
         self.sliding_window._prune()
     
@@ -411,7 +487,7 @@ class SmartContextBuilder:
             'used': self.sliding_window.total_tokens,
             'remaining': self.max_tokens - self.sliding_window.total_tokens,
             'budget_allocation': self.budget,
-            'chunks': len(self.sliding_window.chunks)
+            'chunks': len(self.sliding_window)
         }
 
 
@@ -1,38 +1,125 @@
 #!/usr/bin/env python3
 """Local Embeddings Server - Platform Independent"""
 
+import base64
+import hashlib
 import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Union
+from typing import Callable, Dict, List, Union
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('embed_server')
 
 ALLOWED_HOSTS = ['127.0.0.1', 'localhost', '::1']
 
+ENCODE_BATCH_SIZE = 64
+# Pre-quantized int8 ONNX export shipped with the sentence-transformers hub models
+ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+FALLBACK_DIM = 384
+EMBED_CACHE_SIZE = 10000
+BATCH_MAX_WAIT = 0.005  # seconds to wait for more requests to join a batch
+
+
+def _cuda_available() -> bool:
+    # Probe through NVML so the check does not initialize CUDA; a CUDA
+    # context created in the gunicorn master cannot be used after fork()
+    os.environ.setdefault('PYTORCH_NVML_BASED_CUDA_CHECK', '1')
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def _intra_op_threads() -> int:
+    """
+    Intra-op threads per process: half the cores for a single process,
+    an equal share of the cores when several workers encode side by side
+    """
+    workers = int(os.environ.get('EMBED_WORKERS', '1'))
+    return max(1, (os.cpu_count() or 2) // max(2, workers))
+
+
+@lru_cache(maxsize=4)
+def _get_model(source: str):
+    """
+    Load a model once per process and share it between LocalEmbeddings
+    instances; runs at reduced precision: FP16 on CUDA, int8 ONNX on CPU
+    """
+    from sentence_transformers import SentenceTransformer
+    
+    if _cuda_available():
+        model = SentenceTransformer(source, device="cuda")
+        model.half()
+        logger.info("Embedding model running in FP16 on CUDA")
+        return model
+    
+    threads = _intra_op_threads()
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    
+    model_kwargs = {"file_name": ONNX_INT8_FILE}
+    try:
+        import onnxruntime
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        model_kwargs["session_options"] = session_options
+    except ImportError:
+        pass
+    
+    try:
+        model = SentenceTransformer(
+            source,
+            backend="onnx",
+            model_kwargs=model_kwargs
+        )
+        logger.info("Embedding model running int8 ONNX on CPU")
+        return model
+    except Exception as e:
+        logger.warning(f"int8 ONNX backend unavailable, using FP32: {e}")
+        return SentenceTransformer(source)
+
 
 class LocalEmbeddings:
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, cache_size: int = EMBED_CACHE_SIZE):
         self.model_path = Path(model_path) if model_path else None
         self.model = None
         self.model_name = "all-MiniLM-L6-v2"
+        # LRU of blake2b(text) -> embedding
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         self._load_model()
     
     def _load_model(self):
         try:
-            from sentence_transformers import SentenceTransformer
             logger.info(f"Loading embedding model: {self.model_name}")
             
+            source = self.model_name
             if self.model_path and self.model_path.exists():
                 model_files = list(self.model_path.glob("*embed*"))
                 if model_files:
-                    self.model = SentenceTransformer(str(model_files[0]))
+                    source = str(model_files[0])
                     self.model_name = model_files[0].stem
-                else:
-                    self.model = SentenceTransformer(self.model_name)
-            else:
-                self.model = SentenceTransformer(self.model_name)
             
+            self.model = _get_model(source)
             logger.info("Embedding model loaded successfully")
         except ImportError:
             logger.error("sentence-transformers not installed")
@@ -41,35 +128,151 @@ class LocalEmbeddings:
             logger.error(f"Failed to load embedding model: {e}")
             self.model = None
     
-    def embed(self, texts: Union[str, List[str]]) -> List[List[float]]:
+    @property
+    def dimension(self) -> int:
+        if self.model:
+            return self.model.get_sentence_embedding_dimension()
+        return FALLBACK_DIM
+    
+    def embed(self, texts: Union[str, List[str]]) -> np.ndarray:
+        """Embed texts into a (len(texts), dimension) float32 array"""
         if isinstance(texts, str):
             texts = [texts]
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        
+        # Serve repeated texts from the cache; only encode the misses
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        results: List[np.ndarray] = [None] * len(texts)
+        misses: Dict[bytes, List[int]] = {}
         
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[i] = cached
+                else:
+                    misses.setdefault(key, []).append(i)
+        
+        if misses:
+            positions = list(misses.values())
+            encoded = self._encode([texts[idx[0]] for idx in positions])
+            
+            with self._cache_lock:
+                for key, idx, row in zip(misses, positions, encoded):
+                    # Copy the row so the cache does not pin the whole batch array
+                    embedding = row.copy()
+                    for i in idx:
+                        results[i] = embedding
+                    self._cache[key] = embedding
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        
+        return np.stack(results)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
         if self.model:
-            embeddings = self.model.encode(texts, convert_to_tensor=False)
-            return embeddings.tolist()
+            embeddings = self.model.encode(
+                texts,
+                batch_size=ENCODE_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            return embeddings.astype(np.float32, copy=False)
         else:
-            # Fallback: simple hash-based embeddings
-            import hashlib
-            results = []
-            for text in texts:
-                hash_obj = hashlib.sha256(text.encode())
-                vector = []
-                for i in range(384):
-                    hash_obj.update(str(i).encode())
-                    vector.append(int(hash_obj.hexdigest()[:8], 16) / 2**32)
-                results.append(vector)
-            return results
+            # Fallback: hash-based embeddings, one SHAKE-128 digest per text
+            digests = b"".join(
+                hashlib.shake_128(text.encode()).digest(FALLBACK_DIM * 4)
+                for text in texts
+            )
+            vectors = np.frombuffer(digests, dtype='<u4').astype(np.float32)
+            vectors *= 1.0 / 2**32
+            return vectors.reshape(len(texts), FALLBACK_DIM)
+
+
+class BatchingEmbedder:
+    """
+    Coalesces concurrent embed requests into a single model call
+    A background thread drains the queue for up to max_wait seconds or
+    max_batch texts, encodes them together and splits the results back.
+    """
+    
+    def __init__(self, embedder: LocalEmbeddings, max_batch: int = ENCODE_BATCH_SIZE,
+                 max_wait: float = BATCH_MAX_WAIT):
+        self.embedder = embedder
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue" = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+    
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so a preloaded app starts its
+        # worker lazily in each serving process
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, args=(self._queue,), daemon=True).start()
+                self._pid = os.getpid()
+    
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for embedding; the future resolves to their vectors"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((texts, future))
+        return future
+    
+    def embed(self, texts: List[str], timeout: float = 30) -> np.ndarray:
+        return self.submit(texts).result(timeout=timeout)
+    
+    def _drain(self, requests: "queue.Queue") -> list:
+        batch = [requests.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        
+        return batch
+    
+    def _run(self, requests: "queue.Queue"):
+        while True:
+            batch = self._drain(requests)
+            flat_texts = [text for texts, _ in batch for text in texts]
+            
+            try:
+                embeddings = self.embedder.embed(flat_texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            offset = 0
+            for texts, future in batch:
+                future.set_result(embeddings[offset:offset + len(texts)])
+                offset += len(texts)
 
 
 def create_app(model_path: str = None):
     try:
-        from flask import Flask, request, jsonify
+        from flask import Flask, Response, request, jsonify
     except ImportError:
         logger.error("Flask not installed")
         raise
     
     embedder = LocalEmbeddings(model_path)
+    batcher = BatchingEmbedder(embedder)
     app = Flask(__name__)
     
     @app.before_request
@@ -94,16 +297,31 @@ def create_app(model_path: str = None):
             if isinstance(texts, str):
                 texts = [texts]
             
-            embeddings = embedder.embed(texts)
+            embeddings = batcher.embed(texts)
             
-            return jsonify({
+            if data.get('encoding_format', 'float') == 'base64':
+                # OpenAI-compatible: raw little-endian float32 bytes per row
+                raw = np.ascontiguousarray(embeddings, dtype='<f4')
+                rows = [base64.b64encode(row.tobytes()).decode('ascii') for row in raw]
+            elif orjson:
+                # orjson serializes the float32 rows directly
+                rows = embeddings
+            else:
+                rows = embeddings.tolist()
+            payload = {
                 'object': 'list',
                 'data': [
                     {'object': 'embedding', 'embedding': emb, 'index': i}
-                    for i, emb in enumerate(embeddings)
+                    for i, emb in enumerate(rows)
                 ],
                 'model': embedder.model_name
-            })
+            }
+            if orjson:
+                return Response(
+                    orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+                    mimetype='application/json'
+                )
+            return jsonify(payload)
         except Exception as e:
             logger.error(f"Embedding failed: {e}")
             return jsonify({'error': str(e)}), 500
@@ -111,12 +329,57 @@ def create_app(model_path: str = None):
     return app
 
 
-def start_embed_server(host: str = '127.0.0.1', port: int = 8001, model_path: str = None):
+def _serve_gunicorn(app_factory: Callable, host: str, port: int, workers: int, threads: int):
+    from gunicorn.app.base import BaseApplication
+    
+    class EmbedApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"{host}:{port}")
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            # Each worker creates the app and loads the model after the fork:
+            # neither a CUDA context nor onnxruntime's thread pools survive
+            # fork(), so the master must never load the model
+            self.cfg.set('preload_app', False)
+        
+        def load(self):
+            return app_factory()
+    
+    EmbedApplication().run()
+
+
+def start_embed_server(host: str = '127.0.0.1', port: int = 8001, model_path: str = None,
+                       workers: int = 4):
     logger.info(f"Starting Embeddings server on {host}:{port}")
-    app = create_app(model_path)
     import logging as flask_logging
     flask_logging.getLogger('werkzeug').setLevel(flask_logging.ERROR)
-    app.run(host=host, port=port, threaded=True)
+    
+    # A single process should own the CUDA context; scale with threads instead
+    use_cuda = _cuda_available()
+    if use_cuda:
+        workers, threads = 1, 8
+    else:
+        threads = 1
+    
+    if os.name == 'nt':
+        try:
+            from waitress import serve
+            logger.info("Using Waitress WSGI server")
+            serve(create_app(model_path), host=host, port=port, threads=workers * threads)
+            return
+        except ImportError:
+            logger.warning("Waitress not installed, falling back to Flask dev server")
+    else:
+        try:
+            logger.info(f"Using Gunicorn: {workers} worker(s) x {threads} thread(s)")
+            # Inherited by the workers to split the CPU thread budget
+            os.environ['EMBED_WORKERS'] = str(workers)
+            _serve_gunicorn(lambda: create_app(model_path), host, port, workers, threads)
+            return
+        except ImportError:
+            logger.warning("Gunicorn not installed, falling back to Flask dev server")
+    
+    create_app(model_path).run(host=host, port=port, threaded=True)
 
 
 if __name__ == '__main__':
@@ -125,5 +388,6 @@ if __name__ == '__main__':
     parser.add_argument('--host', default='127.0.0.1')
     parser.add_argument('--port', type=int, default=8001)
     parser.add_argument('--model-path', default=None)
+    parser.add_argument('--workers', type=int, default=4)
     args = parser.parse_args()
-    start_embed_server(args.host, args.port, args.model_path)
+    start_embed_server(args.host, args.port, args.model_path, args.workers)
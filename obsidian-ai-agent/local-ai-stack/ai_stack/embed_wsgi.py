@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for the embeddings server
+
+    EMBED_WORKERS=4 gunicorn -w 4 -b 127.0.0.1:8001 ai_stack.embed_wsgi:app
+
+With a GPU, run a single worker that owns the CUDA context:
+
+    gunicorn -w 1 --threads 8 -b 127.0.0.1:8001 ai_stack.embed_wsgi:app
+
+Do not --preload: each worker must load the model after the fork, since
+neither CUDA nor onnxruntime's thread pools survive it. EMBED_WORKERS
+splits the CPU threads between the workers.
+"""
+
+import os
+
+try:
+    from ai_stack.embed_server import create_app
+except ImportError:
+    from embed_server import create_app
+
+app = create_app(os.environ.get('EMBED_MODEL_PATH'))
@@ -6,21 +6,41 @@ Provides comprehensive error handling, retry mechanisms, circuit breakers,
 validation, and graceful degradation for production stability.
 """
 
+import atexit
 import functools
+import itertools
 import logging
+import os
+import queue
 import random
 import time
 import traceback
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Type, Tuple, Union
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Tuple, Union
 import threading
 
 logger = logging.getLogger(__name__)
 
+_DAY_SECS = 24 * 60 * 60
 
+
+def _indexed(enum_cls):
+    """
+    Give each member an ``index`` in definition order, so members can index
+    counter lists and dispatch tables while keeping their string values.
+    """
+    for index, member in enumerate(enum_cls):
+        member.index = index
+    return enum_cls
+
+
+@_indexed
 class ErrorSeverity(Enum):
     """Severity levels for errors."""
     DEBUG = "debug"
@@ -30,6 +50,7 @@ class ErrorSeverity(Enum):
     CRITICAL = "critical"
 
 
+@_indexed
 class ErrorCategory(Enum):
     """Categories of errors for grouping and analysis."""
     NETWORK = "network"
@@ -41,19 +62,33 @@ class ErrorCategory(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorContext:
     """Context information for an error."""
     error: Exception
     category: ErrorCategory
     severity: ErrorSeverity
-    timestamp: datetime
+    timestamp: float  # time.time(); converted to datetime only when serialised
     component: str
     operation: str
-    context_data: Dict[str, Any] = field(default_factory=dict)
-    stack_trace: str = ""
+    # None when the caller supplied no context, to skip an empty dict per error
+    context_data: Optional[Dict[str, Any]] = None
     retry_count: int = 0
     recovered: bool = False
+    _stack_trace: Optional[str] = field(default=None, repr=False)
+    
+    @property
+    def stack_trace(self) -> str:
+        """Formatted traceback of the error, built on first access."""
+        if self._stack_trace is None:
+            error = self.error
+            if error is not None and error.__traceback__ is not None:
+                self._stack_trace = ''.join(
+                    traceback.format_exception(type(error), error, error.__traceback__)
+                )
+            else:
+                self._stack_trace = ""
+        return self._stack_trace
     
     def to_dict(self) -> Dict:
         return {
@@ -61,10 +96,10 @@ class ErrorContext:
             'error_message': str(self.error),
             'category': self.category.value,
             'severity': self.severity.value,
-            'timestamp': self.timestamp.isoformat(),
+            'timestamp': datetime.fromtimestamp(self.timestamp, tz=timezone.utc).isoformat(),
             'component': self.component,
             'operation': self.operation,
-            'context': self.context_data,
+            'context': self.context_data or {},
             'stack_trace': self.stack_trace,
             'retry_count': self.retry_count,
             'recovered': self.recovered
@@ -76,9 +111,25 @@ class ErrorHandler:
     Centralized error handler with logging, metrics, and recovery tracking.
     """
     
-    def __init__(self):
-        self._error_history: List[ErrorContext] = []
-        self._error_counts: Dict[ErrorCategory, int] = {}
+    # Logger method per severity, indexed by the severity's index
+    _LOG_DISPATCH = (
+        logger.debug,
+        logger.info,
+        logger.warning,
+        logger.error,
+        logger.critical
+    )
+    
+    def __init__(self, max_history: int = 10_000):
+        # Bounded history; counters track exactly what it holds
+        self._max_history = max_history
+        self._error_history: deque = deque(maxlen=max_history)
+        # Counters indexed by the enum members' index
+        self._error_counts: List[int] = [0] * len(ErrorCategory)
+        self._severity_counts: List[int] = [0] * len(ErrorSeverity)
+        # Timestamps of errors in the last 24h, oldest first; capped like the
+        # history, so errors_24h counts the 24h errors still held in history
+        self._recent: deque = deque(maxlen=max_history)
         self._lock = threading.RLock()
         self._handlers: Dict[ErrorCategory, List[Callable]] = {}
     
@@ -107,45 +158,29 @@ class ErrorHandler:
         Returns:
             ErrorContext with full error information
         """
-        context_data = context or {}
-        
         error_ctx = ErrorContext(
             error=error,
             category=category,
             severity=severity,
-            timestamp=datetime.utcnow(),
+            timestamp=time.time(),
             component=component,
             operation=operation,
-            context_data=context_data,
-            stack_trace=traceback.format_exc()
+            context_data=context
         )
         
         with self._lock:
-            self._error_history.append(error_ctx)
-            self._error_counts[category] = self._error_counts.get(category, 0) + 1
-            
-            # Call registered handlers
-            for handler in self._handlers.get(category, []):
-                try:
-                    handler(error_ctx)
-                except Exception as e:
-                    logger.error(f"Error handler failed: {e}")
+            self._record(error_ctx)
+            self._trim_recent(error_ctx.timestamp)
         
         # Log based on severity
-        log_func = {
-            ErrorSeverity.DEBUG: logger.debug,
-            ErrorSeverity.INFO: logger.info,
-            ErrorSeverity.WARNING: logger.warning,
-            ErrorSeverity.ERROR: logger.error,
-            ErrorSeverity.CRITICAL: logger.critical
-        }.get(severity, logger.error)
+        log_func = self._LOG_DISPATCH[severity.index]
         
         log_func(
             f"[{component}.{operation}] {category.value}: {error}",
             extra={
                 'error_category': category.value,
                 'error_severity': severity.value,
-                'error_context': context_data
+                'error_context': context or {}
             }
         )
         
@@ -154,6 +189,89 @@ class ErrorHandler:
         
         return error_ctx
     
+    def handle_many(
+        self,
+        events: Iterable[Tuple[Exception, ErrorCategory, ErrorSeverity, str, str, Optional[Dict]]]
+    ) -> List[ErrorContext]:
+        """
+        Handle a batch of errors under a single lock acquisition.
+        
+        Each event is an ``(error, category, severity, component, operation,
+        context)`` tuple. Custom handlers still run per error, but only one
+        summary line is logged for the whole batch.
+        
+        Returns:
+            ErrorContext for each event, in order
+        """
+        now = time.time()
+        contexts = [
+            ErrorContext(
+                error=error,
+                category=category,
+                severity=severity,
+                timestamp=now,
+                component=component,
+                operation=operation,
+                context_data=context
+            )
+            for error, category, severity, component, operation, context in events
+        ]
+        if not contexts:
+            return contexts
+        
+        batch_counts = [0] * len(ErrorSeverity)
+        with self._lock:
+            for error_ctx in contexts:
+                self._record(error_ctx)
+                batch_counts[error_ctx.severity.index] += 1
+            self._trim_recent(now)
+        
+        # One summary line at the highest severity in the batch
+        worst = max(i for i, n in enumerate(batch_counts) if n)
+        worst_severity = list(ErrorSeverity)[worst]
+        summary = ", ".join(
+            f"{severity.value}={n}"
+            for severity, n in zip(ErrorSeverity, batch_counts) if n
+        )
+        self._LOG_DISPATCH[worst](
+            f"Handled {len(contexts)} errors ({summary})",
+            extra={
+                'error_severity': worst_severity.value,
+                'error_batch_size': len(contexts)
+            }
+        )
+        
+        return contexts
+    
+    def _record(self, error_ctx: ErrorContext) -> None:
+        """Add an error to history and counters and run its handlers (lock held)."""
+        if len(self._error_history) == self._max_history:
+            evicted = self._error_history.popleft()
+            self._forget(evicted)
+        self._error_history.append(error_ctx)
+        self._error_counts[error_ctx.category.index] += 1
+        self._severity_counts[error_ctx.severity.index] += 1
+        self._recent.append(error_ctx.timestamp)
+        
+        # Call registered handlers
+        for handler in self._handlers.get(error_ctx.category, []):
+            try:
+                handler(error_ctx)
+            except Exception as e:
+                logger.error(f"Error handler failed: {e}")
+    
+    def _forget(self, evicted: ErrorContext) -> None:
+        """Drop an evicted error from the running counters."""
+        self._error_counts[evicted.category.index] -= 1
+        self._severity_counts[evicted.severity.index] -= 1
+    
+    def _trim_recent(self, now: float) -> None:
+        """Drop timestamps older than 24h from the left of the window."""
+        cutoff = now - _DAY_SECS
+        recent = self._recent
+        while recent and recent[0] <= cutoff:
+            recent.popleft()
+    
     def register_handler(
         self, 
         category: ErrorCategory, 
@@ -169,25 +287,24 @@ class ErrorHandler:
         """Get error statistics."""
         with self._lock:
             total = len(self._error_history)
-            recent = [
-                e for e in self._error_history 
-                if e.timestamp > datetime.utcnow() - timedelta(hours=24)
-            ]
+            self._trim_recent(time.time())
             
             return {
                 'total_errors': total,
-                'errors_24h': len(recent),
-                'by_category': dict(self._error_counts),
+                'errors_24h': len(self._recent),
+                'by_category': {
+                    category: n
+                    for category, n in zip(ErrorCategory, self._error_counts) if n
+                },
                 'by_severity': self._count_by_severity()
             }
     
     def _count_by_severity(self) -> Dict[str, int]:
         """Count errors by severity."""
-        counts = {}
-        for ctx in self._error_history:
-            key = ctx.severity.value
-            counts[key] = counts.get(key, 0) + 1
-        return counts
+        return {
+            severity.value: n
+            for severity, n in zip(ErrorSeverity, self._severity_counts) if n
+        }
     
     def get_recent_errors(
         self, 
@@ -196,10 +313,11 @@ class ErrorHandler:
     ) -> List[ErrorContext]:
         """Get recent errors, optionally filtered by category."""
         with self._lock:
-            errors = self._error_history
-            if category:
-                errors = [e for e in errors if e.category == category]
-            return sorted(errors, key=lambda e: e.timestamp, reverse=True)[:count]
+            # History is appended in order, so newest-first is a reverse walk
+            errors = reversed(self._error_history)
+            if category is not None:
+                errors = (e for e in errors if e.category is category)
+            return list(itertools.islice(errors, count))
 
 
 # Global error handler instance
@@ -211,6 +329,47 @@ def get_error_handler() -> ErrorHandler:
     return _global_error_handler
 
 
+_log_listener: Optional[QueueListener] = None
+
+
+def enable_buffered_logging() -> Optional[QueueListener]:
+    """
+    Route this module's log records through a queue drained by a background thread.
+    
+    The handlers on the module logger (or the root logger, if it has none)
+    are moved behind a QueueListener, so logging an error on the caller's
+    thread is just an enqueue. Call after logging is configured; it runs at
+    import when OBSIDIAN_LOG_BUFFERED is set.
+    
+    Returns:
+        The running listener, or None if there were no handlers to buffer
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return _log_listener
+    
+    own_handlers = list(logger.handlers)
+    targets = own_handlers or logging.getLogger().handlers
+    if not targets:
+        return None
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in own_handlers:
+        logger.removeHandler(handler)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+    
+    _log_listener = QueueListener(log_queue, *targets, respect_handler_level=True)
+    _log_listener.start()
+    # Flush whatever is still queued on interpreter shutdown
+    atexit.register(_log_listener.stop)
+    return _log_listener
+
+
+if os.environ.get('OBSIDIAN_LOG_BUFFERED'):
+    enable_buffered_logging()
+
+
 class CircuitBreakerState(Enum):
     """States for circuit breaker pattern."""
     CLOSED = "closed"      # Normal operation
@@ -231,23 +390,35 @@ class CircuitBreaker:
         failure_threshold: int = 5,
         recovery_timeout: float = 60.0,
         half_open_max_calls: int = 3,
-        success_threshold: int = 2
+        success_threshold: int = 2,
+        failure_window: Optional[float] = None
     ):
         self.name = name
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.half_open_max_calls = half_open_max_calls
         self.success_threshold = success_threshold
+        # Failures only count towards tripping while they are this recent
+        self.failure_window = failure_window if failure_window is not None else recovery_timeout
         
         self._state = CircuitBreakerState.CLOSED
-        self._failure_count = 0
+        # Monotonic timestamps of failures inside the window, oldest first
+        self._failures: deque = deque()
         self._success_count = 0
-        self._last_failure_time: Optional[datetime] = None
+        # Monotonic clock drives recovery timing; wall clock is kept only
+        # for display in get_stats()
+        self._last_failure_monotonic: Optional[float] = None
+        self._last_failure_time: Optional[float] = None
         self._half_open_calls = 0
         self._lock = threading.RLock()
     
     def can_execute(self) -> bool:
         """Check if a call should be allowed through."""
+        # Lock-free fast path: a single attribute read is atomic under the
+        # GIL, and CLOSED never needs a state transition here
+        if self._state is CircuitBreakerState.CLOSED:
+            return True
+        
         with self._lock:
             if self._state == CircuitBreakerState.CLOSED:
                 return True
@@ -270,41 +441,81 @@ class CircuitBreaker:
     
     def record_success(self) -> None:
         """Record a successful call."""
+        if self._state is CircuitBreakerState.CLOSED:
+            # Old failures age out of the window; nothing to record
+            return
+        
         with self._lock:
             if self._state == CircuitBreakerState.HALF_OPEN:
                 self._success_count += 1
                 if self._success_count >= self.success_threshold:
                     self._reset()
                     logger.info(f"Circuit {self.name} CLOSED (recovered)")
-            else:
-                self._failure_count = max(0, self._failure_count - 1)
     
     def record_failure(self) -> None:
         """Record a failed call."""
+        if self._state is CircuitBreakerState.CLOSED:
+            # deque append/popleft are atomic, so the window needs no lock
+            failures = self._record_in_window()
+            if failures < self.failure_threshold:
+                return
+            
+            # Threshold reached: take the lock only for the transition,
+            # re-checking in case another thread already tripped it
+            with self._lock:
+                if (self._state is CircuitBreakerState.CLOSED
+                        and len(self._failures) >= self.failure_threshold):
+                    self._state = CircuitBreakerState.OPEN
+                    logger.warning(
+                        f"Circuit {self.name} OPEN ({len(self._failures)} failures "
+                        f"in {self.failure_window:g}s)"
+                    )
+            return
+        
         with self._lock:
-            self._failure_count += 1
-            self._last_failure_time = datetime.utcnow()
+            failures = self._record_in_window()
             
             if self._state == CircuitBreakerState.HALF_OPEN:
                 self._state = CircuitBreakerState.OPEN
                 logger.warning(f"Circuit {self.name} OPEN (recovery failed)")
-            elif self._failure_count >= self.failure_threshold:
+            elif failures >= self.failure_threshold:
                 self._state = CircuitBreakerState.OPEN
-                logger.warning(f"Circuit {self.name} OPEN ({self._failure_count} failures)")
+                logger.warning(
+                    f"Circuit {self.name} OPEN ({failures} failures "
+                    f"in {self.failure_window:g}s)"
+                )
+    
+    def _record_in_window(self) -> int:
+        """Add a failure to the sliding window and return the window size."""
+        now = time.monotonic()
+        self._last_failure_monotonic = now
+        self._last_failure_time = time.time()
+        
+        failures = self._failures
+        failures.append(now)
+        cutoff = now - self.failure_window
+        try:
+            while failures[0] < cutoff:
+                failures.popleft()
+        except IndexError:
+            # Emptied concurrently by another thread
+            pass
+        return len(failures)
     
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to try recovery."""
-        if self._last_failure_time is None:
-            return True
-        elapsed = (datetime.utcnow() - self._last_failure_time).total_seconds()
-        return elapsed >= self.recovery_timeout
+        return (
+            self._last_failure_monotonic is None
+            or time.monotonic() - self._last_failure_monotonic >= self.recovery_timeout
+        )
     
     def _reset(self) -> None:
         """Reset circuit breaker to closed state."""
         self._state = CircuitBreakerState.CLOSED
-        self._failure_count = 0
+        self._failures.clear()
         self._success_count = 0
         self._half_open_calls = 0
+        self._last_failure_monotonic = None
         self._last_failure_time = None
     
     @property
@@ -316,9 +527,12 @@ class CircuitBreaker:
         return {
             'name': self.name,
             'state': self._state.value,
-            'failure_count': self._failure_count,
+            'failure_count': len(self._failures),
             'success_count': self._success_count,
-            'last_failure': self._last_failure_time.isoformat() if self._last_failure_time else None
+            'last_failure': (
+                datetime.fromtimestamp(self._last_failure_time, tz=timezone.utc).isoformat()
+                if self._last_failure_time else None
+            )
         }
 
 
@@ -342,6 +556,13 @@ class RetryStrategy:
         self.exponential_base = exponential_base
         self.jitter = jitter
         self.retryable_exceptions = retryable_exceptions or (Exception,)
+        # Own generator so concurrent retries don't share the module-level one
+        self._rng = random.Random() if jitter else None
+        # Backoff before each retry, capped at max_delay
+        self._base_delays: Tuple[float, ...] = tuple(
+            min(initial_delay * exponential_base ** i, max_delay)
+            for i in range(max(max_attempts - 1, 0))
+        )
     
     def execute(
         self,
@@ -378,14 +599,10 @@ class RetryStrategy:
                 if attempt == self.max_attempts:
                     break
                 
-                # Calculate delay
-                delay = min(
-                    self.initial_delay * (self.exponential_base ** (attempt - 1)),
-                    self.max_delay
-                )
+                delay = self._base_delays[attempt - 1]
                 
                 if self.jitter:
-                    delay = delay * (0.5 + random.random())
+                    delay = delay * (0.5 + self._rng.random())
                 
                 if error_handler:
                     error_handler.handle(
@@ -445,13 +662,40 @@ def with_retry(
             jitter=jitter
         )
         
+        # Resolve everything the wrapper needs once, at decoration time
+        execute = strategy.execute
+        handler = error_handler or get_error_handler()
+        component = func.__module__
+        operation = func.__name__
+        
+        if max_attempts == 1:
+            # Nothing to retry: call straight through and only report failures
+            retryable = strategy.retryable_exceptions
+            
+            @functools.wraps(func)
+            def single_attempt(*args, **kwargs):
+                try:
+                    return func(*args, **kwargs)
+                except retryable as e:
+                    handler.handle(
+                        error=e,
+                        category=ErrorCategory.UNKNOWN,
+                        severity=ErrorSeverity.ERROR,
+                        component=component,
+                        operation=operation,
+                        context={'attempt': 1, 'max_attempts': 1}
+                    )
+                    raise
+            
+            return single_attempt
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            return strategy.execute(
+            return execute(
                 func, *args,
-                error_handler=error_handler or get_error_handler(),
-                component=func.__module__,
-                operation=func.__name__,
+                error_handler=handler,
+                component=component,
+                operation=operation,
                 **kwargs
             )
         
@@ -471,21 +715,26 @@ def with_circuit_breaker(circuit_breaker: CircuitBreaker):
         def call_api():
             return requests.get(url)
     """
+    # Bound methods looked up once rather than on every call
+    can_execute = circuit_breaker.can_execute
+    record_success = circuit_breaker.record_success
+    record_failure = circuit_breaker.record_failure
+    
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            if not circuit_breaker.can_execute():
+            if not can_execute():
                 raise CircuitBreakerOpenError(
                     f"Circuit breaker '{circuit_breaker.name}' is OPEN"
                 )
             
             try:
                 result = func(*args, **kwargs)
-                circuit_breaker.record_success()
-                return result
-            except Exception as e:
-                circuit_breaker.record_failure()
+            except Exception:
+                record_failure()
                 raise
+            record_success()
+            return result
         
         return wrapper
     return decorator
@@ -511,9 +760,10 @@ class Validator:
     @staticmethod
     def not_empty(value: str, name: str = "value") -> str:
         """Validate that string is not empty."""
-        if not value or not value.strip():
-            raise ValueError(f"{name} cannot be empty")
-        return value
+        # isspace() checks in place instead of allocating a stripped copy
+        if value and not value.isspace():
+            return value
+        raise ValueError(f"{name} cannot be empty")
     
     @staticmethod
     def in_range(
@@ -532,7 +782,8 @@ class Validator:
     @staticmethod
     def is_type(value: Any, expected_type: Type, name: str = "value") -> Any:
         """Validate that value is of expected type."""
-        if not isinstance(value, expected_type):
+        # Exact type match skips the MRO walk in isinstance()
+        if type(value) is not expected_type and not isinstance(value, expected_type):
             raise TypeError(
                 f"{name} must be {expected_type.__name__}, got {type(value).__name__}"
             )
@@ -645,14 +896,18 @@ class GracefulDegradation:
         """Return cached value on error (stale cache pattern)."""
         try:
             result = func(*args, **kwargs)
-            cache[cache_key] = (result, datetime.utcnow())
+            # Entries are (result, time.monotonic() when cached)
+            cache[cache_key] = (result, time.monotonic())
             return result
         except Exception as e:
-            if cache_key in cache:
-                result, cached_at = cache[cache_key]
-                logger.warning(f"Using stale cache from {cached_at}: {e}")
-                return result
-            raise
+            entry = cache.get(cache_key)
+            if entry is None:
+                raise
+            result, cached_at = entry
+            logger.warning(
+                f"Using stale cache ({time.monotonic() - cached_at:.1f}s old): {e}"
+            )
+            return result
     
     @staticmethod
     def with_default_on_error(func: Callable, default: Any, *args, **kwargs):
@@ -678,10 +933,14 @@ class HealthStatus:
 class HealthMonitor:
     """Monitor health of system components."""
     
-    def __init__(self):
+    def __init__(self, ttl: float = 0):
         self._checks: Dict[str, Callable[[], HealthStatus]] = {}
         self._statuses: Dict[str, HealthStatus] = {}
         self._lock = threading.RLock()
+        # Results younger than this are served without rerunning the checks;
+        # the default of 0 reruns them on every call
+        self._ttl = ttl
+        self._last_check_time: Optional[float] = None
     
     def register_check(
         self, 
@@ -691,26 +950,49 @@ class HealthMonitor:
         """Register a health check."""
         with self._lock:
             self._checks[name] = check_func
+            self._last_check_time = None
+    
+    def _is_fresh(self, now: float) -> bool:
+        return (self._last_check_time is not None
+                and now - self._last_check_time < self._ttl)
     
-    def check_all(self) -> Dict[str, HealthStatus]:
-        """Run all health checks."""
+    def _run_check(self, name: str, check_func: Callable[[], HealthStatus]) -> HealthStatus:
+        try:
+            status = check_func()
+        except Exception as e:
+            status = HealthStatus(
+                component=name,
+                healthy=False,
+                message=f"Health check failed: {e}",
+                last_check=datetime.utcnow()
+            )
+        self._statuses[name] = status
+        return status
+    
+    def check_all(self, force: bool = False) -> Dict[str, HealthStatus]:
+        """Run all health checks, reusing results from the last ttl seconds."""
         with self._lock:
+            now = time.monotonic()
+            if not force and self._is_fresh(now):
+                return dict(self._statuses)
+            
             for name, check_func in self._checks.items():
-                try:
-                    self._statuses[name] = check_func()
-                except Exception as e:
-                    self._statuses[name] = HealthStatus(
-                        component=name,
-                        healthy=False,
-                        message=f"Health check failed: {e}",
-                        last_check=datetime.utcnow()
-                    )
+                self._run_check(name, check_func)
+            self._last_check_time = now
             return dict(self._statuses)
     
     def is_healthy(self) -> bool:
-        """Check if all components are healthy."""
-        statuses = self.check_all()
-        return all(s.healthy for s in statuses.values())
+        """Check if all components are healthy, stopping at the first failure."""
+        with self._lock:
+            now = time.monotonic()
+            if self._is_fresh(now):
+                return all(s.healthy for s in self._statuses.values())
+            
+            for name, check_func in self._checks.items():
+                if not self._run_check(name, check_func).healthy:
+                    return False
+            self._last_check_time = now
+            return True
 
 
 if __name__ == "__main__":
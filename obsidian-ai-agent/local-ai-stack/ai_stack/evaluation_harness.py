@@ -9,18 +9,202 @@ Provides:
 - Feedback loop for improvement
 """
 
+import bisect
 import json
 import logging
+import os
 import re
-from typing import List, Dict, Optional, Any, Tuple
-from dataclasses import dataclass, field
+from typing import List, Dict, Iterator, Optional, Any, Sequence, Tuple, Union
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, OrderedDict
+import hashlib
 import math
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('evaluation')
 
+EVAL_CACHE_SIZE = 4096
+CONTEXT_INDEX_SIZE = 2048
+
+# Compiled once; these run several times per evaluated response.
+# A greedy \w run always starts and ends on a word boundary, so the
+# tokenizers need no \b anchors (which only cost extra checks per position).
+_WORD4 = re.compile(r'\w{4,}')
+_WORD3 = re.compile(r'\w{3,}')
+# Same tokens for ASCII text; an explicit class beats the Unicode \w lookup.
+_WORD4_ASCII = re.compile(r'[A-Za-z0-9_]{4,}')
+_WORD3_ASCII = re.compile(r'[A-Za-z0-9_]{3,}')
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+_DOC_REF = re.compile(
+    r'\b(according to|in|from)\s+(?:the\s+)?["\']?([^"\']+)(?:document|paper|article|book)',
+    re.IGNORECASE
+)
+_LONG_NUMBER = re.compile(r'\b\d{5,}\b')
+_ATTRIBUTION = re.compile(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\s+(?:said|stated|mentioned)\b')
+# (context statement, response negation, concept precedes the verb).
+# The negation patterns are lookaheads so overlapping negations are all
+# found; each captures the whole word run a concept would have to match.
+_CONTRADICTION_PATTERNS = [
+    (re.compile(r'is\s+(\w+)', re.IGNORECASE),
+     re.compile(r'(?=is\s+not\s+(\w+))', re.IGNORECASE), False, r'is\s+not\s+{}'),
+    (re.compile(r'are\s+(\w+)', re.IGNORECASE),
+     re.compile(r'(?=are\s+not\s+(\w+))', re.IGNORECASE), False, r'are\s+not\s+{}'),
+    (re.compile(r'(\w+)\s+is', re.IGNORECASE),
+     re.compile(r'(?=(\w+)\s+is\s+not)', re.IGNORECASE), True, r'{}\s+is\s+not'),
+]
+_YES_NO_QUESTION = re.compile(r'^(is|are|does|do|can|will|has|have)\b')
+_YES_NO_ANSWER = re.compile(r'\b(yes|no|indeed|certainly|not)\b')
+_WHAT_QUESTION = re.compile(r'^(what|which)\b')
+_HOW_QUESTION = re.compile(r'^how\b')
+_HOW_ANSWER = re.compile(r'\b(step|first|then|next|finally|by)\b')
+_WHY_QUESTION = re.compile(r'^why\b')
+_WHY_ANSWER = re.compile(r'\b(because|since|as|reason|due to)\b')
+
+_TERMINATORS_TO_SPACE = str.maketrans('.!?', '   ')
+# _check_length: score for word counts below each bound, then above the last
+_LENGTH_BOUNDS = (10, 50, 500)
+_LENGTH_SCORES = (0.5, 0.8, 1.0, 0.7)
+
+# _calculate_overall_score: (metric, weight, inverted so higher is better)
+_SCORE_WEIGHTS = (
+    ('faithfulness', 0.25, False),
+    ('relevance', 0.25, False),
+    ('hallucination_risk', 0.20, True),
+    ('coverage', 0.15, False),
+    ('length_appropriateness', 0.10, False),
+    ('structure_quality', 0.05, False),
+)
+
+_STOP_WORDS = frozenset({'what', 'when', 'where', 'which', 'how', 'does', 'is', 'are', 'the', 'and', 'or'})
+
+# Feedback comment keywords per issue; one alternation scans a comment once.
+# No keyword's suffix is another's prefix, so non-overlapping matching
+# finds every keyword a substring test would.
+_ISSUE_KEYWORDS = {
+    'wrong': 'incorrect_info',
+    'incorrect': 'incorrect_info',
+    'long': 'too_long',
+    'verbose': 'too_long',
+    'short': 'too_short',
+    'brief': 'too_short',
+    'relevant': 'not_relevant',
+    'related': 'not_relevant',
+}
+_ISSUE_ORDER = ('incorrect_info', 'too_long', 'too_short', 'not_relevant')
+_ISSUE_KEYWORD_RE = re.compile('|'.join(map(re.escape, _ISSUE_KEYWORDS)))
+
+
+_last_timestamp: Tuple[int, str] = (0, '')
+
+
+def _now_iso() -> str:
+    """
+    Local ISO timestamp at one-second granularity
+    
+    Results and feedback records are stamped in bulk, so the formatted
+    string is reused for every call within the same second.
+    """
+    global _last_timestamp
+    second = int(time.time())
+    cached = _last_timestamp
+    if cached[0] != second:
+        cached = _last_timestamp = (second, datetime.fromtimestamp(second).isoformat())
+    return cached[1]
+
+
+def _has_non_finite(value) -> bool:
+    """True if a float anywhere in value is NaN or infinite"""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(v) for v in value)
+    return False
+
+
+def _dump_json_line(record: Dict) -> bytes:
+    """
+    Serialize a record as one JSON line, as json.dumps would
+    orjson is used when it produces the same document: it writes NaN and
+    infinity as null and rejects some types json accepts, so those records
+    go through json.dumps.
+    """
+    if orjson and not _has_non_finite(record):
+        try:
+            return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass
+    return json.dumps(record).encode('utf-8')
+
+
+def _sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """(start, end) offsets of the pieces between sentence terminators"""
+    start = 0
+    for match in _SENTENCE_SPLIT.finditer(text):
+        yield start, match.start()
+        start = match.end()
+    yield start, len(text)
+
+
+def word_set(text: str) -> frozenset:
+    """Lowercased words of 4+ characters, the unit all overlap metrics use"""
+    pattern = _WORD4_ASCII if text.isascii() else _WORD4
+    return frozenset(pattern.findall(text.lower()))
+
+
+class ContextIndex:
+    """
+    Memoizes word_set() per retrieved chunk
+    
+    RAG queries keep retrieving the same chunks, so each chunk is tokenized
+    once and a query's context words are the union of its chunks' sets.
+    Chunks are joined with spaces elsewhere, so no word spans two chunks
+    and the union equals word_set() of the joined text.
+    """
+    
+    def __init__(self, max_chunks: int = CONTEXT_INDEX_SIZE):
+        self.max_chunks = max_chunks
+        # LRU of blake2b(chunk) -> word set
+        self._sets: "OrderedDict[bytes, frozenset]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def words(self, chunk: str) -> frozenset:
+        """Word set of a single chunk"""
+        key = hashlib.blake2b(chunk.encode(), digest_size=16).digest()
+        with self._lock:
+            words = self._sets.get(key)
+            if words is not None:
+                self._sets.move_to_end(key)
+                return words
+        
+        words = word_set(chunk)
+        with self._lock:
+            self._sets[key] = words
+            while len(self._sets) > self.max_chunks:
+                self._sets.popitem(last=False)
+        return words
+    
+    def words_of(self, chunks: List[str]) -> frozenset:
+        """Word set of several chunks, as if joined into one context"""
+        if len(chunks) == 1:
+            return self.words(chunks[0])
+        return frozenset().union(*map(self.words, chunks))
+
+
+# Shared by FaithfulnessChecker and ResponseEvaluator
+_context_index = ContextIndex()
+
 
 @dataclass
 class EvaluationResult:
@@ -29,7 +213,7 @@ class EvaluationResult:
     metrics: Dict[str, float]
     issues: List[str]
     suggestions: List[str]
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = field(default_factory=_now_iso)
     
     def to_dict(self) -> Dict:
         return {
@@ -41,6 +225,26 @@ class EvaluationResult:
         }
 
 
+@dataclass(slots=True)
+class TextStats:
+    """Counts the length and structure heuristics need, gathered up front"""
+    char_count: int
+    word_count: int
+    sentence_count: int  # pieces between sentence terminators
+    sentence_words: int  # words once terminators also act as separators
+    has_paragraph_break: bool
+    
+    @classmethod
+    def of(cls, text: str) -> 'TextStats':
+        return cls(
+            char_count=len(text),
+            word_count=len(text.split()),
+            sentence_count=len(_SENTENCE_SPLIT.findall(text)) + 1,
+            sentence_words=len(text.translate(_TERMINATORS_TO_SPACE).split()),
+            has_paragraph_break='\n\n' in text
+        )
+
+
 class HallucinationDetector:
     """
     Detects hallucinations in LLM responses
@@ -64,22 +268,37 @@ class HallucinationDetector:
             r'\d{4}',  # Years (potential historical claims)
             r'\b(percent|percentage)\b',
         ]
+        
+        # Each list collapsed into one alternation so a text is scanned once
+        self._uncertainty_re = self._combine(self.uncertainty_patterns)
+        self._factual_re = self._combine(self.factual_patterns)
     
-    def detect(self, response: str, context: str = "") -> Dict:
+    @staticmethod
+    def _combine(patterns: List[str]) -> re.Pattern:
+        """Compile patterns into a single case-insensitive alternation"""
+        return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+    
+    def detect(self, response: str, context: Union[str, Sequence[str]] = "",
+               context_words: Optional[frozenset] = None) -> Dict:
         """
         Detect potential hallucinations in response
+        
+        context may be one string or the retrieved chunks, which are then
+        scanned one by one rather than joined. context_words may be passed
+        in when the caller has already run word_set() over the context.
         """
+        contexts = [context] if isinstance(context, str) else context
         issues = []
         confidence_score = 1.0
         
         # 1. Check for unsupported claims
-        unsupported = self._check_unsupported_claims(response, context)
+        unsupported = self._check_unsupported_claims(response, contexts, context_words)
         if unsupported:
             issues.extend(unsupported)
             confidence_score -= 0.2 * len(unsupported)
         
         # 2. Check for contradictions with context
-        contradictions = self._check_contradictions(response, context)
+        contradictions = self._check_contradictions(response, contexts)
         if contradictions:
             issues.extend(contradictions)
             confidence_score -= 0.3 * len(contradictions)
@@ -104,33 +323,34 @@ class HallucinationDetector:
             'risk_level': 'high' if confidence_score < 0.3 else 'medium' if confidence_score < 0.7 else 'low'
         }
     
-    def _check_unsupported_claims(self, response: str, context: str) -> List[str]:
+    def _check_unsupported_claims(self, response: str, contexts: Sequence[str],
+                                  context_words: Optional[frozenset] = None) -> List[str]:
         """Identify claims not supported by context"""
         issues = []
-        
-        # Extract factual sentences
-        sentences = re.split(r'[.!?]+', response)
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
+        if not any(contexts):
+            # Nothing to check claims against
+            return issues
+        if context_words is None:
+            # Tokenize the context once, not once per claim
+            context_words = _context_index.words_of(contexts)
+        
+        # Scan factual sentences in place; only claims are sliced out
+        factual_search = self._factual_re.search
+        for start, end in _sentence_spans(response):
+            # Check if it looks like a factual claim (never true for blank spans)
+            if factual_search(response, start, end) is None:
                 continue
             
-            # Check if it looks like a factual claim
-            is_factual = any(re.search(pattern, sentence, re.IGNORECASE) 
-                           for pattern in self.factual_patterns)
-            
-            if is_factual:
-                # Check if supported by context
-                if context and not self._is_supported(sentence, context):
-                    issues.append(f"Potentially unsupported claim: '{sentence[:100]}...'")
+            # Check if supported by context
+            sentence = response[start:end].strip()
+            if not self._is_supported(sentence, context_words):
+                issues.append(f"Potentially unsupported claim: '{sentence[:100]}...'")
         
         return issues
     
-    def _is_supported(self, claim: str, context: str) -> bool:
+    def _is_supported(self, claim: str, context_words: frozenset) -> bool:
         """Check if claim is supported by context (simple keyword overlap)"""
-        claim_words = set(re.findall(r'\b\w{4,}\b', claim.lower()))
-        context_words = set(re.findall(r'\b\w{4,}\b', context.lower()))
+        claim_words = word_set(claim)
         
         if not claim_words:
             return True
@@ -140,32 +360,58 @@ class HallucinationDetector:
         
         return overlap_ratio > 0.3  # At least 30% of claim words in context
     
-    def _check_contradictions(self, response: str, context: str) -> List[str]:
+    def _check_contradictions(self, response: str, contexts: Sequence[str]) -> List[str]:
         """Check for contradictions with context"""
         issues = []
         
         # Simple contradiction detection
-        # Look for negations of context statements
-        negation_patterns = [
-            (r'is\s+(\w+)', r'is\s+not\s+\1'),
-            (r'are\s+(\w+)', r'are\s+not\s+\1'),
-            (r'(\w+)\s+is', r'\1\s+is\s+not'),
-        ]
-        
-        for pos_pattern, neg_pattern in negation_patterns:
-            for match in re.finditer(pos_pattern, context, re.IGNORECASE):
-                concept = match.group(1)
-                # Check if response negates it
-                if re.search(neg_pattern.replace(r'\1', concept), response, re.IGNORECASE):
-                    issues.append(f"Possible contradiction regarding '{concept}'")
+        # Look for negations of context statements. For ASCII text the response
+        # is scanned once per pattern for every concept it negates, then each
+        # context statement is a set lookup instead of a regex search of the
+        # response. Elsewhere str.lower() disagrees with IGNORECASE matching
+        # ('İ' lowers to two characters, 'ſ' matches 's'), so the negation is
+        # searched for per concept.
+        response_ascii = response.isascii()
+        for pos_pattern, neg_pattern, leading, neg_template in _CONTRADICTION_PATTERNS:
+            negated = None
+            for context in contexts:
+                if response_ascii and context.isascii():
+                    if negated is None:
+                        negated = self._negated_concepts(neg_pattern, response, leading)
+                    if not negated:
+                        continue
+                    for match in pos_pattern.finditer(context):
+                        concept = match.group(1)
+                        if concept.lower() in negated:
+                            issues.append(f"Possible contradiction regarding '{concept}'")
+                else:
+                    for match in pos_pattern.finditer(context):
+                        concept = match.group(1)
+                        if re.search(neg_template.format(concept), response, re.IGNORECASE):
+                            issues.append(f"Possible contradiction regarding '{concept}'")
         
         return issues
     
+    @staticmethod
+    def _negated_concepts(neg_pattern: re.Pattern, response: str, leading: bool) -> set:
+        """
+        Lowercased concepts the response negates
+        
+        The negation need not sit on a word boundary: a concept after the verb
+        matches any prefix of the following word, one before it any suffix of
+        the preceding word. The lookahead already yields every such suffix,
+        since it is tried at each position of the word; prefixes are added.
+        """
+        words = [word.lower() for word in neg_pattern.findall(response)]
+        if leading:
+            return set(words)
+        return {word[:i] for word in words for i in range(1, len(word) + 1)}
+    
     def _analyze_confidence_markers(self, response: str) -> Dict:
         """Analyze confidence markers in response"""
-        uncertainty_count = 0
-        for pattern in self.uncertainty_patterns:
-            uncertainty_count += len(re.findall(pattern, response, re.IGNORECASE))
+        # The uncertainty phrases never overlap, so one findall over the
+        # alternation counts the same matches as one findall per pattern
+        uncertainty_count = len(self._uncertainty_re.findall(response))
         
         uncertainty_penalty = min(0.3, uncertainty_count * 0.05)
         
@@ -179,18 +425,17 @@ class HallucinationDetector:
         issues = []
         
         # Pattern 1: References to non-existent documents
-        doc_refs = re.findall(r'\b(according to|in|from)\s+(?:the\s+)?["\']?([^"\']+)(?:document|paper|article|book)', 
-                              response, re.IGNORECASE)
+        doc_refs = _DOC_REF.findall(response)
         for _, ref in doc_refs:
             issues.append(f"Reference to external source: '{ref}'")
         
         # Pattern 2: Specific numbers without context
-        suspicious_numbers = re.findall(r'\b\d{5,}\b', response)
+        suspicious_numbers = _LONG_NUMBER.findall(response)
         if suspicious_numbers:
             issues.append(f"Suspiciously specific numbers: {suspicious_numbers}")
         
         # Pattern 3: Invention of names/details
-        invented_details = re.findall(r'\b[A-Z][a-z]+\s+[A-Z][a-z]+\s+(?:said|stated|mentioned)\b', response)
+        invented_details = _ATTRIBUTION.findall(response)
         if invented_details:
             issues.append(f"Potentially invented quotes or attributions")
         
@@ -206,16 +451,26 @@ class FaithfulnessChecker:
         """
         Calculate faithfulness metrics
         """
-        combined_context = " ".join(contexts)
+        return self.check_tokenized(word_set(response), _context_index.words_of(contexts))
+    
+    def check_tokenized(self, response_words: frozenset, context_words: frozenset) -> Dict:
+        """
+        Calculate faithfulness metrics from word_set() output
+        """
+        # All three metrics derive from a single intersection
+        overlap = len(response_words & context_words)
         
         # 1. Answer coverage (does it use the context?)
-        coverage = self._calculate_coverage(response, combined_context)
+        coverage = overlap / len(context_words) if context_words else 1.0
         
         # 2. Information precision (is it adding new info?)
-        precision = self._calculate_precision(response, combined_context)
+        precision = overlap / len(response_words) if response_words else 1.0
         
-        # 3. Semantic similarity
-        similarity = self._calculate_similarity(response, combined_context)
+        # 3. Semantic similarity (Jaccard; union size = |A| + |B| - overlap)
+        if response_words and context_words:
+            similarity = overlap / (len(response_words) + len(context_words) - overlap)
+        else:
+            similarity = 0.0
         
         # Overall faithfulness
         faithfulness = (coverage * 0.3 + precision * 0.4 + similarity * 0.3)
@@ -227,41 +482,6 @@ class FaithfulnessChecker:
             'similarity': similarity,
             'is_faithful': faithfulness > 0.7
         }
-    
-    def _calculate_coverage(self, response: str, context: str) -> float:
-        """Calculate how much of the context is used in response"""
-        context_words = set(re.findall(r'\b\w{4,}\b', context.lower()))
-        response_words = set(re.findall(r'\b\w{4,}\b', response.lower()))
-        
-        if not context_words:
-            return 1.0
-        
-        coverage = len(response_words & context_words) / len(context_words)
-        return coverage
-    
-    def _calculate_precision(self, response: str, context: str) -> float:
-        """Calculate precision (how much of response is from context)"""
-        response_words = set(re.findall(r'\b\w{4,}\b', response.lower()))
-        context_words = set(re.findall(r'\b\w{4,}\b', context.lower()))
-        
-        if not response_words:
-            return 1.0
-        
-        precision = len(response_words & context_words) / len(response_words)
-        return precision
-    
-    def _calculate_similarity(self, text1: str, text2: str) -> float:
-        """Calculate simple semantic similarity using word overlap"""
-        words1 = set(re.findall(r'\b\w{4,}\b', text1.lower()))
-        words2 = set(re.findall(r'\b\w{4,}\b', text2.lower()))
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
-        
-        return intersection / union if union > 0 else 0.0
 
 
 class AnswerRelevanceScorer:
@@ -299,9 +519,9 @@ class AnswerRelevanceScorer:
     def _extract_key_terms(self, text: str) -> List[str]:
         """Extract key terms from text"""
         # Remove stop words and extract meaningful terms
-        stop_words = {'what', 'when', 'where', 'which', 'how', 'does', 'is', 'are', 'the', 'and', 'or'}
-        words = re.findall(r'\b\w{3,}\b', text.lower())
-        return [w for w in words if w not in stop_words]
+        pattern = _WORD3_ASCII if text.isascii() else _WORD3
+        words = pattern.findall(text.lower())
+        return [w for w in words if w not in _STOP_WORDS]
     
     def _check_direct_answer(self, question: str, answer: str) -> float:
         """Check if answer directly addresses the question type"""
@@ -311,25 +531,25 @@ class AnswerRelevanceScorer:
         score = 0.0
         
         # Yes/No questions
-        if re.match(r'^(is|are|does|do|can|will|has|have)\b', question_lower):
-            if re.search(r'\b(yes|no|indeed|certainly|not)\b', answer_lower):
+        if _YES_NO_QUESTION.match(question_lower):
+            if _YES_NO_ANSWER.search(answer_lower):
                 score = 1.0
         
         # What/Which questions
-        elif re.match(r'^(what|which)\b', question_lower):
+        elif _WHAT_QUESTION.match(question_lower):
             if len(answer.split()) > 3:  # Substantial answer
                 score = 0.8
         
         # How questions
-        elif re.match(r'^how\b', question_lower):
-            if re.search(r'\b(step|first|then|next|finally|by)\b', answer_lower):
+        elif _HOW_QUESTION.match(question_lower):
+            if _HOW_ANSWER.search(answer_lower):
                 score = 1.0
             else:
                 score = 0.6
         
         # Why questions
-        elif re.match(r'^why\b', question_lower):
-            if re.search(r'\b(because|since|as|reason|due to)\b', answer_lower):
+        elif _WHY_QUESTION.match(question_lower):
+            if _WHY_ANSWER.search(answer_lower):
                 score = 1.0
         
         return score
@@ -340,11 +560,17 @@ class ResponseEvaluator:
     Complete response evaluation combining all metrics
     """
     
-    def __init__(self, llm_client=None):
+    def __init__(self, llm_client=None, cache_size: int = EVAL_CACHE_SIZE):
         self.llm = llm_client
         self.hallucination_detector = HallucinationDetector(llm_client)
         self.faithfulness_checker = FaithfulnessChecker()
         self.relevance_scorer = AnswerRelevanceScorer()
+        
+        # LRU of blake2b(question, answer, contexts) -> result; evaluation is
+        # deterministic in its inputs, so repeat queries skip all the scoring
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, EvaluationResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def evaluate(self, question: str, answer: str, 
                  retrieved_contexts: List[str] = None) -> EvaluationResult:
@@ -352,20 +578,82 @@ class ResponseEvaluator:
         Complete evaluation of a response
         """
         retrieved_contexts = retrieved_contexts or []
-        combined_context = " ".join(retrieved_contexts)
+        if self.cache_size <= 0:
+            return self._evaluate(question, answer, retrieved_contexts)
+        
+        key = self._cache_key(question, answer, retrieved_contexts)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            # Fresh containers and timestamp so callers can't alter the cache
+            return replace(
+                cached,
+                metrics=dict(cached.metrics),
+                issues=list(cached.issues),
+                suggestions=list(cached.suggestions),
+                timestamp=_now_iso()
+            )
+        
+        result = self._evaluate(question, answer, retrieved_contexts)
+        with self._cache_lock:
+            self._cache[key] = replace(
+                result,
+                metrics=dict(result.metrics),
+                issues=list(result.issues),
+                suggestions=list(result.suggestions)
+            )
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+    
+    def evaluate_batch(self, items: List[Tuple[str, str, List[str]]],
+                       max_workers: int = 4) -> List[EvaluationResult]:
+        """
+        Evaluate many (question, answer, contexts) items, in input order
+        Items run on a thread pool sharing this evaluator's lock-guarded
+        result cache and the context index
+        """
+        if max_workers <= 1 or len(items) <= 1:
+            return [self.evaluate(*item) for item in items]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(lambda item: self.evaluate(*item), items))
+    
+    @staticmethod
+    def _cache_key(question: str, answer: str, contexts: List[str]) -> bytes:
+        """Digest identifying an evaluation's inputs"""
+        h = hashlib.blake2b(digest_size=16)
+        for part in (question, answer, *contexts):
+            encoded = part.encode()
+            # Length-prefix each part so different splits can't collide
+            h.update(len(encoded).to_bytes(8, 'little'))
+            h.update(encoded)
+        return h.digest()
+    
+    def _evaluate(self, question: str, answer: str,
+                  retrieved_contexts: List[str]) -> EvaluationResult:
+        """Uncached evaluation behind evaluate()"""
+        # Tokenized once and shared by the hallucination and faithfulness checks
+        context_words = _context_index.words_of(retrieved_contexts)
         
         metrics = {}
         issues = []
         suggestions = []
         
         # 1. Hallucination detection
-        hallucination_result = self.hallucination_detector.detect(answer, combined_context)
+        hallucination_result = self.hallucination_detector.detect(
+            answer, retrieved_contexts, context_words
+        )
         metrics['hallucination_risk'] = 1.0 - hallucination_result['confidence_score']
         issues.extend(hallucination_result['issues'])
         
         # 2. Faithfulness check
         if retrieved_contexts:
-            faithfulness_result = self.faithfulness_checker.check(answer, retrieved_contexts)
+            faithfulness_result = self.faithfulness_checker.check_tokenized(
+                word_set(answer), context_words
+            )
             metrics['faithfulness'] = faithfulness_result['faithfulness_score']
             metrics['coverage'] = faithfulness_result['coverage']
             
@@ -382,8 +670,9 @@ class ResponseEvaluator:
             suggestions.append(f"Try to address these key terms: {relevance_result['matched_terms']}")
         
         # 4. Quality heuristics
-        metrics['length_appropriateness'] = self._check_length(answer)
-        metrics['structure_quality'] = self._check_structure(answer)
+        stats = TextStats.of(answer)
+        metrics['length_appropriateness'] = self._check_length(stats)
+        metrics['structure_quality'] = self._check_structure(stats)
         
         # Calculate overall score
         overall = self._calculate_overall_score(metrics)
@@ -402,31 +691,21 @@ class ResponseEvaluator:
             suggestions=suggestions
         )
     
-    def _check_length(self, text: str) -> float:
+    def _check_length(self, stats: 'TextStats') -> float:
         """Check if response length is appropriate"""
-        word_count = len(text.split())
-        
-        if word_count < 10:
-            return 0.5  # Too short
-        elif word_count < 50:
-            return 0.8  # Brief but OK
-        elif word_count < 500:
-            return 1.0  # Good length
-        else:
-            return 0.7  # Might be too long
+        # <10 too short, <50 brief but OK, <500 good length, else might be too long
+        return _LENGTH_SCORES[bisect.bisect_right(_LENGTH_BOUNDS, stats.word_count)]
     
-    def _check_structure(self, text: str) -> float:
+    def _check_structure(self, stats: 'TextStats') -> float:
         """Check response structure quality"""
         score = 1.0
         
         # Check for proper paragraphing
-        paragraphs = text.split('\n\n')
-        if len(paragraphs) == 1 and len(text) > 200:
+        if not stats.has_paragraph_break and stats.char_count > 200:
             score -= 0.2  # Wall of text
         
         # Check for proper sentences
-        sentences = re.split(r'[.!?]+', text)
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
+        avg_sentence_length = stats.sentence_words / stats.sentence_count
         
         if avg_sentence_length > 30:
             score -= 0.2  # Sentences too long
@@ -435,22 +714,13 @@ class ResponseEvaluator:
     
     def _calculate_overall_score(self, metrics: Dict[str, float]) -> float:
         """Calculate overall quality score"""
-        weights = {
-            'faithfulness': 0.25,
-            'relevance': 0.25,
-            'hallucination_risk': 0.20,  # Inverted
-            'coverage': 0.15,
-            'length_appropriateness': 0.10,
-            'structure_quality': 0.05
-        }
-        
         total_weight = 0
         weighted_sum = 0
         
-        for metric, weight in weights.items():
-            if metric in metrics:
-                value = metrics[metric]
-                if metric == 'hallucination_risk':
+        for metric, weight, inverted in _SCORE_WEIGHTS:
+            value = metrics.get(metric)
+            if value is not None:
+                if inverted:
                     value = 1.0 - value  # Invert so higher is better
                 weighted_sum += value * weight
                 total_weight += weight
@@ -461,18 +731,32 @@ class ResponseEvaluator:
 class FeedbackLoop:
     """
     Collect and apply feedback for continuous improvement
+    Keeps the month's feedback file open for appending; use as a context
+    manager or call close() when done (it is also closed on collection)
     """
     
     def __init__(self, storage_path: str = "./feedback"):
         self.storage_path = storage_path
         self.feedback_history: List[Dict] = []
+        # Append handle for the current month's file, reopened on rollover;
+        # the finalizer closes it if the loop is dropped without close()
+        self._feedback_file = None
+        self._feedback_month: Optional[str] = None
+        self._file_finalizer: Optional[weakref.finalize] = None
+        # Running aggregates over feedback_history[:_scanned] for get_insights;
+        # rebuilt from scratch if the history is truncated or replaced
+        self._scanned = 0
+        self._scanned_history: List[Dict] = self.feedback_history
+        self._rating_sum = 0
+        self._rating_counts: Counter = Counter()
+        self._issue_counts: Counter = Counter()
     
     def collect_feedback(self, query: str, response: str, 
                          user_rating: int, user_comment: str = "",
                          evaluation_metrics: Dict = None):
         """Collect user feedback on a response"""
         feedback = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'query': query,
             'response': response,
             'user_rating': user_rating,  # 1-5
@@ -483,54 +767,85 @@ class FeedbackLoop:
         self.feedback_history.append(feedback)
         
         # Save to disk
-        self._save_feedback()
+        self._save_feedback(feedback)
     
-    def _save_feedback(self):
-        """Save feedback to disk"""
-        import os
-        os.makedirs(self.storage_path, exist_ok=True)
-        
-        filepath = f"{self.storage_path}/feedback_{datetime.now().strftime('%Y%m')}.jsonl"
-        with open(filepath, 'a') as f:
-            for fb in self.feedback_history:
-                f.write(json.dumps(fb) + '\n')
+    def _save_feedback(self, feedback: Dict):
+        """Append one feedback record to this month's JSONL file"""
+        # 'YYYY-MM-...' timestamp -> 'YYYYMM' file suffix
+        month = feedback['timestamp'][:7].replace('-', '')
+        if month != self._feedback_month:
+            self.close()
+            os.makedirs(self.storage_path, exist_ok=True)
+            filepath = f"{self.storage_path}/feedback_{month}.jsonl"
+            self._feedback_file = open(filepath, 'ab')
+            self._file_finalizer = weakref.finalize(self, self._feedback_file.close)
+            self._feedback_month = month
+        
+        self._feedback_file.write(_dump_json_line(feedback) + b'\n')
+        self._feedback_file.flush()
+    
+    def close(self):
+        """Close the feedback file"""
+        if self._file_finalizer is not None:
+            # Runs the close once and unregisters it
+            self._file_finalizer()
+            self._file_finalizer = None
+        self._feedback_file = None
+        self._feedback_month = None
+    
+    def __enter__(self) -> 'FeedbackLoop':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
     def get_insights(self) -> Dict:
         """Analyze feedback for insights"""
         if not self.feedback_history:
             return {'message': 'No feedback collected yet'}
         
-        ratings = [fb['user_rating'] for fb in self.feedback_history]
+        self._scan_new_feedback()
         
         return {
             'total_feedback': len(self.feedback_history),
-            'average_rating': sum(ratings) / len(ratings),
+            'average_rating': self._rating_sum / self._scanned,
             'rating_distribution': {
-                str(i): ratings.count(i) for i in range(1, 6)
+                str(i): self._rating_counts[i] for i in range(1, 6)
             },
             'common_issues': self._extract_common_issues()
         }
     
+    def _scan_new_feedback(self):
+        """Fold feedback added since the last call into the running aggregates"""
+        if (self._scanned_history is not self.feedback_history
+                or len(self.feedback_history) < self._scanned):
+            self._scanned = 0
+            self._rating_sum = 0
+            self._rating_counts.clear()
+            self._issue_counts.clear()
+            self._scanned_history = self.feedback_history
+        
+        for fb in self.feedback_history[self._scanned:]:
+            rating = fb['user_rating']
+            self._rating_sum += rating
+            self._rating_counts[rating] += 1
+            
+            comment = fb.get('user_comment', '').lower()
+            
+            # Check for common complaint patterns; each issue counts once per comment
+            found = {_ISSUE_KEYWORDS[kw] for kw in _ISSUE_KEYWORD_RE.findall(comment)}
+            for issue in _ISSUE_ORDER:
+                if issue in found:
+                    self._issue_counts[issue] += 1
+        
+        self._scanned = len(self.feedback_history)
+    
     def _extract_common_issues(self) -> List[str]:
         """Extract common issues from feedback"""
-        issue_counts = defaultdict(int)
+        self._scan_new_feedback()
         
-        for fb in self.feedback_history:
-            comment = fb.get('user_comment', '').lower()
-            
-            # Check for common complaint patterns
-            if 'wrong' in comment or 'incorrect' in comment:
-                issue_counts['incorrect_info'] += 1
-            if 'long' in comment or 'verbose' in comment:
-                issue_counts['too_long'] += 1
-            if 'short' in comment or 'brief' in comment:
-                issue_counts['too_short'] += 1
-            if 'relevant' in comment or 'related' in comment:
-                issue_counts['not_relevant'] += 1
-        
-        # Return top issues
-        sorted_issues = sorted(issue_counts.items(), key=lambda x: x[1], reverse=True)
-        return [f"{issue} ({count} times)" for issue, count in sorted_issues[:5]]
+        # Return top issues; ties keep first-seen order, as the stable sort did
+        return [f"{issue} ({count} times)" for issue, count in self._issue_counts.most_common(5)]
 
 
 # Example usage
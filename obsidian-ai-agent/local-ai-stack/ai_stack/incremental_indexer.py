@@ -8,17 +8,47 @@ tracking file modifications via hash-based change detection.
 
 import hashlib
 import json
+import os
+import re
 import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Callable
+from typing import Dict, List, Optional, Set, Tuple, Callable, Union
 from dataclasses import dataclass, asdict
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import threading
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Applied to every new connection. WAL turns each commit into an append to
+# the write-ahead log, and synchronous=NORMAL defers the fsync to checkpoints,
+# which is still durable against application crashes.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64MB page cache
+    "PRAGMA mmap_size=268435456",
+)
+
+# Most note text (in characters) kept between detect_changes and index_changes
+# for the embedding callback; notes beyond it are re-read when indexed
+PENDING_CONTENT_LIMIT = 32 * 1024 * 1024
+
+# Notes modified this close to a scan are "racy" (as in git): a same-size edit
+# within one mtime tick would leave the stat unchanged, so they are always
+# hashed and their stat is not stored for the size/mtime fast path
+RACY_WINDOW_NS = 2_000_000_000
+
+# Markdown syntax characters replaced by spaces before counting words
+_MD_STRIP_RE = re.compile(r'[#\*\[\]\(\)\|`\-]')
+# Inline [text](url) links or [[wikilinks]]; only counted, so no capture groups
+_LINK_RE = re.compile(r'\[[^\]]+\]\([^)]+\)|\[\[[^\]]+\]\]')
+# #tags, including nested tags like #project/active
+_TAG_RE = re.compile(r'#([a-zA-Z0-9_\-\/]+)')
+
 
 @dataclass
 class IndexEntry:
@@ -32,6 +62,8 @@ class IndexEntry:
     word_count: int = 0
     link_count: int = 0
     tags: List[str] = None
+    file_size: int = 0
+    mtime_ns: int = 0
     
     def __post_init__(self):
         if self.tags is None:
@@ -74,8 +106,11 @@ class ChangeTracker:
     def _get_connection(self):
         """Get thread-local database connection."""
         if not hasattr(self._local, 'connection') or self._local.connection is None:
-            self._local.connection = sqlite3.connect(self.db_path)
-            self._local.connection.row_factory = sqlite3.Row
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            for pragma in _CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.connection = conn
         try:
             yield self._local.connection
         except Exception:
@@ -95,7 +130,9 @@ class ChangeTracker:
                     indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     word_count INTEGER DEFAULT 0,
                     link_count INTEGER DEFAULT 0,
-                    tags TEXT DEFAULT '[]'
+                    tags TEXT DEFAULT '[]',
+                    file_size INTEGER DEFAULT 0,
+                    mtime_ns INTEGER DEFAULT 0
                 );
                 
                 CREATE INDEX IF NOT EXISTS idx_file_path ON index_state(file_path);
@@ -110,12 +147,20 @@ class ChangeTracker:
                 INSERT OR IGNORE INTO index_metadata (key, value) 
                 VALUES ('version', '1.0'), ('last_full_index', 'never');
             """)
+            
+            # Databases created before stat tracking lack these columns
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(index_state)")}
+            for column in ('file_size', 'mtime_ns'):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE index_state ADD COLUMN {column} INTEGER DEFAULT 0")
             conn.commit()
     
     @staticmethod
-    def compute_hash(content: str) -> str:
-        """Compute SHA-256 hash of content."""
-        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+    def compute_hash(content: Union[str, bytes]) -> str:
+        """Compute SHA-256 hash of content (str is hashed as UTF-8)."""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return hashlib.sha256(content).hexdigest()
     
     def get_entry(self, note_id: str) -> Optional[IndexEntry]:
         """Get index entry for a note."""
@@ -135,7 +180,9 @@ class ChangeTracker:
                     indexed_at=datetime.fromisoformat(row['indexed_at']),
                     word_count=row['word_count'],
                     link_count=row['link_count'],
-                    tags=json.loads(row['tags'])
+                    tags=json.loads(row['tags']),
+                    file_size=row['file_size'],
+                    mtime_ns=row['mtime_ns']
                 )
             return None
     
@@ -153,7 +200,9 @@ class ChangeTracker:
                     indexed_at=datetime.fromisoformat(row['indexed_at']),
                     word_count=row['word_count'],
                     link_count=row['link_count'],
-                    tags=json.loads(row['tags'])
+                    tags=json.loads(row['tags']),
+                    file_size=row['file_size'],
+                    mtime_ns=row['mtime_ns']
                 )
                 for row in rows
             }
@@ -164,8 +213,8 @@ class ChangeTracker:
             conn.execute("""
                 INSERT OR REPLACE INTO index_state 
                 (note_id, file_path, content_hash, last_modified, embedding_id, 
-                 indexed_at, word_count, link_count, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 indexed_at, word_count, link_count, tags, file_size, mtime_ns)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 entry.note_id,
                 entry.file_path,
@@ -175,7 +224,9 @@ class ChangeTracker:
                 entry.indexed_at.isoformat(),
                 entry.word_count,
                 entry.link_count,
-                json.dumps(entry.tags)
+                json.dumps(entry.tags),
+                entry.file_size,
+                entry.mtime_ns
             ))
             conn.commit()
     
@@ -185,19 +236,28 @@ class ChangeTracker:
             conn.executemany("""
                 INSERT OR REPLACE INTO index_state 
                 (note_id, file_path, content_hash, last_modified, embedding_id, 
-                 indexed_at, word_count, link_count, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 indexed_at, word_count, link_count, tags, file_size, mtime_ns)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, [
                 (
                     e.note_id, e.file_path, e.content_hash, 
                     e.last_modified.isoformat(), e.embedding_id,
                     e.indexed_at.isoformat(), e.word_count, e.link_count,
-                    json.dumps(e.tags)
+                    json.dumps(e.tags), e.file_size, e.mtime_ns
                 )
                 for e in entries
             ])
             conn.commit()
     
+    def update_stats_batch(self, stats: List[Tuple[str, int, int]]) -> None:
+        """Store (note_id, file_size, mtime_ns) for notes whose content is unchanged."""
+        with self._get_connection() as conn:
+            conn.executemany(
+                "UPDATE index_state SET file_size = ?, mtime_ns = ? WHERE note_id = ?",
+                [(size, mtime_ns, note_id) for note_id, size, mtime_ns in stats]
+            )
+            conn.commit()
+    
     def delete_entry(self, note_id: str) -> None:
         """Remove an entry from tracking."""
         with self._get_connection() as conn:
@@ -242,33 +302,36 @@ class IncrementalIndexer:
         self,
         vault_path: str,
         state_db_path: str = "index_state.db",
-        embedding_callback: Optional[Callable[[str, str], str]] = None
+        embedding_callback: Optional[Callable[[str, str], str]] = None,
+        max_workers: Optional[int] = None
     ):
         self.vault_path = Path(vault_path)
         self.tracker = ChangeTracker(state_db_path)
         self.embedding_callback = embedding_callback
+        # Reads and SHA-256 release the GIL, so detection can spread across cores;
+        # metadata extraction does not, so extra threads on one core only add contention
+        self.max_workers = max_workers if max_workers is not None else min(32, os.cpu_count() or 1)
         self._lock = threading.RLock()
         self._stop_event = threading.Event()
         
+        # Decoded text of notes found by detect_changes, kept for the embedding
+        # callback until the next index_changes; guarded by self._lock
+        self._pending_content: Dict[str, str] = {}
+        self._pending_chars = 0
+        
         # Supported markdown extensions
         self.markdown_extensions = {'.md', '.markdown'}
     
     def _extract_note_metadata(self, content: str) -> Dict:
         """Extract metadata from note content."""
-        lines = content.split('\n')
-        
-        # Count words (excluding markdown syntax)
-        import re
-        text_only = re.sub(r'[#\*\[\]\(\)\|`\-]', ' ', content)
-        word_count = len([w for w in text_only.split() if w.strip()])
+        # Count words (excluding markdown syntax); split() never yields blanks
+        word_count = len(_MD_STRIP_RE.sub(' ', content).split())
         
         # Count links
-        link_pattern = r'\[([^\]]+)\]\(([^)]+)\)|\[\[([^\]]+)\]\]'
-        link_count = len(re.findall(link_pattern, content))
+        link_count = len(_LINK_RE.findall(content)) if '[' in content else 0
         
-        # Extract tags
-        tag_pattern = r'#([a-zA-Z0-9_\-\/]+)'
-        tags = list(set(re.findall(tag_pattern, content)))
+        # Extract tags, deduplicated in order of first appearance
+        tags = list(dict.fromkeys(_TAG_RE.findall(content))) if '#' in content else []
         
         return {
             'word_count': word_count,
@@ -276,8 +339,11 @@ class IncrementalIndexer:
             'tags': tags
         }
     
-    def _scan_vault(self) -> Dict[str, Tuple[Path, str, datetime]]:
-        """Scan vault for all markdown files and their metadata."""
+    def _scan_vault(self) -> Dict[str, Tuple[Path, str, datetime, int, int]]:
+        """
+        Scan vault for all markdown files and their metadata.
+        Each note maps to (path, note_id, modified_time, size, mtime_ns).
+        """
         current_files = {}
         
         for file_path in self.vault_path.rglob('*'):
@@ -286,30 +352,55 @@ class IncrementalIndexer:
                     stat = file_path.stat()
                     modified_time = datetime.fromtimestamp(stat.st_mtime)
                     note_id = str(file_path.relative_to(self.vault_path)).replace('\\', '/')
-                    current_files[note_id] = (file_path, note_id, modified_time)
+                    current_files[note_id] = (
+                        file_path, note_id, modified_time, stat.st_size, stat.st_mtime_ns
+                    )
                 except (OSError, ValueError) as e:
                     logger.warning(f"Could not stat {file_path}: {e}")
         
         return current_files
     
-    def _read_note_content(self, file_path: Path) -> Optional[str]:
-        """Safely read note content."""
+    def _read_note_bytes(self, file_path: Path) -> Optional[bytes]:
+        """Safely read raw note bytes."""
         try:
-            return file_path.read_text(encoding='utf-8')
+            return file_path.read_bytes()
         except Exception as e:
             logger.error(f"Failed to read {file_path}: {e}")
             return None
     
+    @staticmethod
+    def _decode_note(data: bytes, file_path: Path) -> Optional[str]:
+        """Decode note bytes the way read_text() would, including newline translation."""
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            logger.error(f"Failed to read {file_path}: {e}")
+            return None
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    def _read_note_content(self, file_path: Path) -> Optional[str]:
+        """Safely read note content."""
+        data = self._read_note_bytes(file_path)
+        if data is None:
+            return None
+        return self._decode_note(data, file_path)
+    
     def detect_changes(self) -> ChangeReport:
         """
         Detect all changes in the vault without performing indexing.
-        Returns a report of what would be indexed.
+        Returns a report of what would be indexed. The stored size and mtime
+        of notes found unchanged by hash are refreshed for the next scan.
         """
         import time
         start_time = time.time()
+        scan_ns = time.time_ns()
         
         current_files = self._scan_vault()
         tracked_entries = self.tracker.get_all_entries()
+        with self._lock:
+            self._clear_pending_content()
         tracked_ids = set(tracked_entries.keys())
         current_ids = set(current_files.keys())
         
@@ -319,42 +410,46 @@ class IncrementalIndexer:
         unchanged = []
         
         # Check for new and modified files
-        for note_id, (file_path, _, modified_time) in current_files.items():
-            content = self._read_note_content(file_path)
-            if content is None:
-                continue
-            
-            current_hash = self.tracker.compute_hash(content)
+        candidates = []
+        for note_id, (file_path, _, modified_time, size, mtime_ns) in current_files.items():
+            tracked = tracked_entries.get(note_id)
             
-            if note_id not in tracked_entries:
-                # New file
-                metadata = self._extract_note_metadata(content)
-                entry = IndexEntry(
-                    note_id=note_id,
-                    file_path=str(file_path),
-                    content_hash=current_hash,
-                    last_modified=modified_time,
-                    word_count=metadata['word_count'],
-                    link_count=metadata['link_count'],
-                    tags=metadata['tags']
-                )
-                added.append(entry)
-            elif tracked_entries[note_id].content_hash != current_hash:
-                # Modified file
-                metadata = self._extract_note_metadata(content)
-                entry = IndexEntry(
-                    note_id=note_id,
-                    file_path=str(file_path),
-                    content_hash=current_hash,
-                    last_modified=modified_time,
-                    embedding_id=tracked_entries[note_id].embedding_id,
-                    word_count=metadata['word_count'],
-                    link_count=metadata['link_count'],
-                    tags=metadata['tags']
-                )
-                modified.append(entry)
-            else:
+            if self._is_racy(mtime_ns, scan_ns):
+                # Hash it, and store mtime 0 so the next scan hashes it again
+                mtime_ns = 0
+            elif tracked is not None and tracked.file_size == size and tracked.mtime_ns == mtime_ns:
+                # Same size and mtime as when indexed: skip the read and hash
                 unchanged.append(note_id)
+                continue
+            candidates.append((note_id, file_path, modified_time, size, mtime_ns, tracked))
+        
+        if self.max_workers <= 1 or len(candidates) <= 1:
+            outcomes = [self._examine_note(*c) for c in candidates]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(candidates))) as executor:
+                outcomes = list(executor.map(lambda c: self._examine_note(*c), candidates))
+        
+        # Hash matched but the stat did not (touched, or a row migrated without
+        # stat columns): store the new stat so the next scan takes the fast path.
+        # Racy notes store mtime 0 and are hashed again next time
+        stale_stats = []
+        for candidate, outcome in zip(candidates, outcomes):
+            if outcome is None:
+                continue
+            kind, value, content = outcome
+            if kind == 'unchanged':
+                unchanged.append(value)
+                stale_stats.append((value, candidate[3], candidate[4]))
+                continue
+            if self.embedding_callback:
+                self._keep_pending_content(value.note_id, content)
+            if kind == 'added':
+                added.append(value)
+            else:
+                modified.append(value)
+        
+        if stale_stats:
+            self.tracker.update_stats_batch(stale_stats)
         
         # Check for deleted files
         for note_id in tracked_ids - current_ids:
@@ -371,51 +466,123 @@ class IncrementalIndexer:
             total_scanned=len(current_files)
         )
     
+    @staticmethod
+    def _is_racy(mtime_ns: int, scan_ns: int) -> bool:
+        """True if the note was modified within RACY_WINDOW_NS of the scan."""
+        return mtime_ns >= scan_ns - RACY_WINDOW_NS
+    
+    def _examine_note(
+        self,
+        note_id: str,
+        file_path: Path,
+        modified_time: datetime,
+        size: int,
+        mtime_ns: int,
+        tracked: Optional[IndexEntry]
+    ) -> Optional[Tuple[str, object, Optional[str]]]:
+        """
+        Read and hash one note against its tracked entry.
+        Returns ('unchanged', note_id, None), ('added' | 'modified', entry, content),
+        or None if the note could not be read. Runs on worker threads, so it
+        only reads from disk and never touches the tracker.
+        """
+        data = self._read_note_bytes(file_path)
+        if data is None:
+            return None
+        
+        current_hash = self.tracker.compute_hash(data)
+        
+        if tracked is not None and tracked.content_hash == current_hash:
+            return ('unchanged', note_id, None)
+        
+        # Only new or modified notes need decoding for metadata
+        content = self._decode_note(data, file_path)
+        if content is None:
+            return None
+        
+        metadata = self._extract_note_metadata(content)
+        entry = IndexEntry(
+            note_id=note_id,
+            file_path=str(file_path),
+            content_hash=current_hash,
+            last_modified=modified_time,
+            embedding_id=tracked.embedding_id if tracked is not None else None,
+            word_count=metadata['word_count'],
+            link_count=metadata['link_count'],
+            tags=metadata['tags'],
+            file_size=size,
+            mtime_ns=mtime_ns
+        )
+        return ('added' if tracked is None else 'modified', entry, content)
+    
     def index_changes(self, report: Optional[ChangeReport] = None) -> ChangeReport:
         """
         Perform incremental indexing based on change detection.
         Updates embeddings only for changed content.
         """
         with self._lock:
-            if report is None:
-                report = self.detect_changes()
-            
-            if not report.has_changes:
-                logger.info(f"No changes detected. Scanned {report.total_scanned} files in {report.duration_ms:.1f}ms")
-                return report
-            
-            logger.info(f"Indexing {report.change_count} changes: "
-                       f"{len(report.added)} added, {len(report.modified)} modified, "
-                       f"{len(report.deleted)} deleted")
-            
-            # Process additions
-            for entry in report.added:
-                if self._stop_event.is_set():
-                    break
-                self._index_entry(entry)
-            
-            # Process modifications
-            for entry in report.modified:
-                if self._stop_event.is_set():
-                    break
-                self._index_entry(entry)
-            
-            # Process deletions
-            if report.deleted and not self._stop_event.is_set():
-                self.tracker.delete_entries_batch(report.deleted)
-                logger.info(f"Removed {len(report.deleted)} deleted notes from index")
-            
-            # Update metadata
-            self.tracker.update_metadata('last_incremental_index', datetime.utcnow().isoformat())
-            
-            logger.info(f"Incremental indexing complete in {report.duration_ms:.1f}ms")
+            try:
+                return self._apply_changes(report)
+            finally:
+                # Kept text only serves this run; don't hold it past a stop or error
+                self._clear_pending_content()
+    
+    def _keep_pending_content(self, note_id: str, content: str) -> None:
+        """Keep a note's text for the embedding callback while under the size cap."""
+        with self._lock:
+            if self._pending_chars + len(content) > PENDING_CONTENT_LIMIT:
+                return
+            self._pending_content[note_id] = content
+            self._pending_chars += len(content)
+    
+    def _clear_pending_content(self) -> None:
+        """Drop kept note text (lock held)."""
+        self._pending_content.clear()
+        self._pending_chars = 0
+    
+    def _apply_changes(self, report: Optional[ChangeReport]) -> ChangeReport:
+        """Body of index_changes (lock held)."""
+        if report is None:
+            report = self.detect_changes()
+        
+        if not report.has_changes:
+            logger.info(f"No changes detected. Scanned {report.total_scanned} files in {report.duration_ms:.1f}ms")
             return report
+        
+        logger.info(f"Indexing {report.change_count} changes: "
+                   f"{len(report.added)} added, {len(report.modified)} modified, "
+                   f"{len(report.deleted)} deleted")
+        
+        # Process additions
+        for entry in report.added:
+            if self._stop_event.is_set():
+                break
+            self._index_entry(entry)
+        
+        # Process modifications
+        for entry in report.modified:
+            if self._stop_event.is_set():
+                break
+            self._index_entry(entry)
+        
+        # Process deletions
+        if report.deleted and not self._stop_event.is_set():
+            self.tracker.delete_entries_batch(report.deleted)
+            logger.info(f"Removed {len(report.deleted)} deleted notes from index")
+        
+        # Update metadata
+        self.tracker.update_metadata('last_incremental_index', datetime.utcnow().isoformat())
+        
+        logger.info(f"Incremental indexing complete in {report.duration_ms:.1f}ms")
+        return report
     
     def _index_entry(self, entry: IndexEntry) -> None:
         """Index a single entry, generating embedding if callback provided."""
         try:
             if self.embedding_callback:
-                content = self._read_note_content(Path(entry.file_path))
+                content = self._pending_content.pop(entry.note_id, None)
+                if content is None:
+                    content = self._read_note_content(Path(entry.file_path))
                 if content:
                     embedding_id = self.embedding_callback(entry.note_id, content)
                     entry.embedding_id = embedding_id
@@ -441,14 +608,19 @@ class IncrementalIndexer:
             self.tracker.update_metadata('last_full_index', datetime.utcnow().isoformat())
             
             # Reindex everything
+            import time
+            scan_ns = time.time_ns()
             current_files = self._scan_vault()
             all_entries = []
             
-            for note_id, (file_path, _, modified_time) in current_files.items():
+            for note_id, (file_path, _, modified_time, size, mtime_ns) in current_files.items():
                 if self._stop_event.is_set():
                     break
                 
-                content = self._read_note_content(file_path)
+                data = self._read_note_bytes(file_path)
+                if data is None:
+                    continue
+                content = self._decode_note(data, file_path)
                 if content is None:
                     continue
                 
@@ -456,11 +628,13 @@ class IncrementalIndexer:
                 entry = IndexEntry(
                     note_id=note_id,
                     file_path=str(file_path),
-                    content_hash=self.tracker.compute_hash(content),
+                    content_hash=self.tracker.compute_hash(data),
                     last_modified=modified_time,
                     word_count=metadata['word_count'],
                     link_count=metadata['link_count'],
-                    tags=metadata['tags']
+                    tags=metadata['tags'],
+                    file_size=size,
+                    mtime_ns=0 if self._is_racy(mtime_ns, scan_ns) else mtime_ns
                 )
                 
                 if self.embedding_callback and content:
@@ -0,0 +1,188 @@
+"""
+Unit tests for the sliding window context manager
+"""
+
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "local-ai-stack" / "ai_stack"))
+
+from context_manager import (
+    ContextChunk,
+    ContextPriority,
+    HierarchicalSummarizer,
+    SlidingWindowManager,
+    SmartContextBuilder
+)
+
+
+def text(char: str, tokens: int) -> str:
+    """Content estimated at exactly the given number of tokens."""
+    return char * (tokens * 4)
+
+
+class TestSlidingWindowEviction(unittest.TestCase):
+    """Test chunks are evicted by priority, then age."""
+    
+    def test_lowest_priority_evicted_first(self):
+        """Test the LOW chunk goes before older higher-priority chunks."""
+        window = SlidingWindowManager(max_tokens=25)
+        window.add(text('m', 10), priority=ContextPriority.MEDIUM)
+        window.add(text('h', 10), priority=ContextPriority.HIGH)
+        window.add(text('l', 10), priority=ContextPriority.LOW)
+        
+        self.assertEqual([c.content[0] for c in window.chunks], ['m', 'h'])
+        self.assertEqual(window.total_tokens, 20)
+    
+    def test_oldest_evicted_within_priority(self):
+        """Test ties on priority evict the earliest chunk."""
+        window = SlidingWindowManager(max_tokens=25)
+        for char in 'abc':
+            window.add(text(char, 10), priority=ContextPriority.MEDIUM)
+        
+        self.assertEqual([c.content[0] for c in window.chunks], ['b', 'c'])
+    
+    def test_batched_adds_prune_once(self):
+        """Test prune=False defers eviction until _prune()."""
+        window = SlidingWindowManager(max_tokens=15)
+        for char in 'abc':
+            window.add(text(char, 10), prune=False)
+        self.assertEqual(len(window), 3)
+        
+        window._prune()
+        self.assertEqual([c.content[0] for c in window.chunks], ['c'])
+        self.assertEqual(window.total_tokens, 10)
+    
+    def test_context_ordered_by_priority_then_age(self):
+        """Test get_context lists high priority first, oldest first."""
+        window = SlidingWindowManager(max_tokens=1000)
+        window.add("low", priority=ContextPriority.LOW)
+        window.add("first", priority=ContextPriority.HIGH)
+        window.add("system", priority=ContextPriority.CRITICAL)
+        window.add("second", priority=ContextPriority.HIGH)
+        
+        self.assertEqual(window.get_context(), "system\n\nfirst\n\nsecond\n\nlow")
+        # Chat format keeps arrival order
+        self.assertEqual(
+            [m['content'] for m in window.get_messages_format()],
+            ["low", "first", "system", "second"]
+        )
+    
+    def test_critical_chunk_truncated_not_evicted(self):
+        """Test an all-CRITICAL window truncates the oldest chunk to fit."""
+        window = SlidingWindowManager(max_tokens=25)
+        window.add(text('a', 20), priority=ContextPriority.CRITICAL)
+        window.add(text('b', 10), priority=ContextPriority.CRITICAL)
+        
+        first, second = window.chunks
+        self.assertEqual(len(window), 2)
+        self.assertEqual(window.total_tokens, 25)
+        self.assertEqual(first.token_count, 15)
+        self.assertTrue(first.content.endswith("..."))
+        self.assertEqual(second.content, text('b', 10))
+    
+    def test_lower_priority_evicted_before_critical_truncated(self):
+        """Test CRITICAL content is only truncated once nothing else is left."""
+        window = SlidingWindowManager(max_tokens=25)
+        window.add(text('a', 20), priority=ContextPriority.CRITICAL)
+        window.add(text('l', 10), priority=ContextPriority.LOW)
+        
+        self.assertEqual([c.content for c in window.chunks], [text('a', 20)])
+        self.assertEqual(window.total_tokens, 20)
+    
+    def test_single_chunk_never_evicted(self):
+        """Test an oversized lone chunk is kept."""
+        window = SlidingWindowManager(max_tokens=5)
+        window.add(text('x', 10), priority=ContextPriority.LOW)
+        
+        self.assertEqual(len(window), 1)
+        self.assertEqual(window.total_tokens, 10)
+
+
+class TestChunkReuse(unittest.TestCase):
+    """Test pre-built and repeated chunks."""
+    
+    def test_prebuilt_chunk_token_count_trusted(self):
+        """Test a ContextChunk is added as-is without a recount."""
+        window = SlidingWindowManager(max_tokens=100)
+        chunk = ContextChunk(content="short", priority=ContextPriority.HIGH,
+                             source="user", token_count=7)
+        window.add(chunk)
+        
+        self.assertIs(window.chunks[0], chunk)
+        self.assertEqual(window.total_tokens, 7)
+    
+    def test_same_chunk_added_twice(self):
+        """Test each add of one chunk object is tracked separately."""
+        window = SlidingWindowManager(max_tokens=100)
+        chunk = ContextChunk(content=text('r', 10), priority=ContextPriority.MEDIUM,
+                             source="retrieval")
+        window.add(chunk)
+        window.add(chunk)
+        
+        self.assertEqual(len(window), 2)
+        self.assertEqual(window.total_tokens, 20)
+        self.assertEqual(window.get_context(), "\n\n".join([chunk.content] * 2))
+    
+    def test_evicting_one_copy_keeps_the_other(self):
+        """Test evicting a repeated chunk leaves its later add live."""
+        window = SlidingWindowManager(max_tokens=15)
+        chunk = ContextChunk(content=text('r', 10), priority=ContextPriority.MEDIUM,
+                             source="retrieval")
+        window.add(chunk)
+        window.add(chunk)
+        
+        self.assertEqual(window.chunks, [chunk])
+        self.assertEqual(window.total_tokens, 10)
+        self.assertEqual(window.get_context(), chunk.content)
+        
+        # Stale heap entries are skipped on the next eviction
+        window.add(text('n', 10), priority=ContextPriority.HIGH)
+        self.assertEqual([c.content[0] for c in window.chunks], ['n'])
+        self.assertEqual(window.total_tokens, 10)
+    
+    def test_builder_messages_are_independent(self):
+        """Test repeated user messages do not share chunk state."""
+        builder = SmartContextBuilder(max_context_tokens=1000)
+        builder.add_user_message("first")
+        builder.add_user_message("second")
+        
+        first, second = builder.sliding_window.chunks
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.metadata, second.metadata)
+        self.assertEqual(
+            builder.build_context(),
+            [{'role': 'user', 'content': "first"}, {'role': 'user', 'content': "second"}]
+        )
+
+
+class TestDocumentChunking(unittest.TestCase):
+    """Test documents are split on sentence boundaries."""
+    
+    def setUp(self):
+        self.summarizer = HierarchicalSummarizer()
+    
+    def split(self, text, chunk_size):
+        return list(self.summarizer._split_into_chunks(text, chunk_size))
+    
+    def test_whitespace_between_sentences_not_counted(self):
+        """Test only sentence lengths count toward the chunk size."""
+        # Two 5-character sentences fit a size of 10 whatever the gap
+        self.assertEqual(self.split("Aaaa. Bbbb. Cccc.", 10), ["Aaaa. Bbbb.", "Cccc."])
+        self.assertEqual(self.split("Aaaa.\n\n\nBbbb.   Cccc.", 10), ["Aaaa.\n\n\nBbbb.", "Cccc."])
+    
+    def test_oversized_sentence_gets_own_chunk(self):
+        """Test a sentence longer than the chunk size is not split."""
+        self.assertEqual(
+            self.split("Short. A much longer sentence here. End.", 10),
+            ["Short.", "A much longer sentence here.", "End."]
+        )
+    
+    def test_empty_text(self):
+        """Test empty text yields one empty chunk."""
+        self.assertEqual(self.split("", 10), [""])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,247 @@
+"""
+Unit tests for the local embedding server
+"""
+
+import base64
+import os
+import threading
+import unittest
+from unittest import mock
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "local-ai-stack" / "ai_stack"))
+
+import numpy as np
+
+from embed_server import (
+    FALLBACK_DIM,
+    BatchingEmbedder,
+    LocalEmbeddings,
+    _intra_op_threads,
+    create_app
+)
+
+try:
+    import flask
+    HAS_FLASK = True
+except ImportError:
+    HAS_FLASK = False
+
+
+class RecordingEmbedder:
+    """Embedder returning [len(text)] per text and recording each call."""
+    
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+    
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("encoder down")
+        return np.array([[len(t)] for t in texts], dtype=np.float32)
+
+
+def fallback_embeddings(**kwargs) -> LocalEmbeddings:
+    """LocalEmbeddings forced onto the deterministic hash fallback."""
+    embedder = LocalEmbeddings(**kwargs)
+    embedder.model = None
+    return embedder
+
+
+class TestLocalEmbeddingsCache(unittest.TestCase):
+    """Test embeddings are cached per text."""
+    
+    def setUp(self):
+        self.embedder = fallback_embeddings()
+        self.encoded = []
+        encode = self.embedder._encode
+        
+        def recording_encode(texts):
+            self.encoded.append(list(texts))
+            return encode(texts)
+        
+        self.embedder._encode = recording_encode
+    
+    def test_shape_and_dtype(self):
+        """Test embed returns one float32 row per text."""
+        vectors = self.embedder.embed(["alpha", "beta"])
+        
+        self.assertEqual(vectors.shape, (2, FALLBACK_DIM))
+        self.assertEqual(vectors.dtype, np.float32)
+        self.assertEqual(self.embedder.embed([]).shape, (0, FALLBACK_DIM))
+        self.assertEqual(self.embedder.embed("alpha").shape, (1, FALLBACK_DIM))
+    
+    def test_duplicates_encoded_once(self):
+        """Test repeated texts in one call are encoded once."""
+        vectors = self.embedder.embed(["a", "b", "a"])
+        
+        self.assertEqual(self.encoded, [["a", "b"]])
+        np.testing.assert_array_equal(vectors[0], vectors[2])
+        self.assertFalse(np.array_equal(vectors[0], vectors[1]))
+    
+    def test_cache_hits_skip_encoding(self):
+        """Test later calls only encode unseen texts."""
+        first = self.embedder.embed(["a", "b"])
+        second = self.embedder.embed(["b", "c", "a"])
+        
+        self.assertEqual(self.encoded, [["a", "b"], ["c"]])
+        np.testing.assert_array_equal(second[0], first[1])
+        np.testing.assert_array_equal(second[2], first[0])
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test the cache is bounded and keeps recently used texts."""
+        self.embedder.cache_size = 2
+        self.embedder.embed(["a", "b"])
+        self.embedder.embed(["a"])
+        self.embedder.embed(["c"])
+        self.embedder.embed(["a", "b"])
+        
+        self.assertEqual(len(self.embedder._cache), 2)
+        self.assertEqual(self.encoded, [["a", "b"], ["c"], ["b"]])
+
+    
+    def test_cached_rows_own_their_memory(self):
+        """Test cache entries are not views into the encoded batch."""
+        self.embedder.embed(["a", "b", "c"])
+        
+        for embedding in self.embedder._cache.values():
+            self.assertIsNone(embedding.base)
+            self.assertEqual(embedding.shape, (FALLBACK_DIM,))
+
+
+class TestBatchingEmbedder(unittest.TestCase):
+    """Test concurrent requests are coalesced into one encode."""
+    
+    def test_requests_coalesced(self):
+        """Test queued requests share one call and get their own rows."""
+        embedder = RecordingEmbedder()
+        batcher = BatchingEmbedder(embedder, max_batch=4, max_wait=5.0)
+        
+        futures = [
+            batcher.submit(["a"]),
+            batcher.submit(["bb", "ccc"]),
+            batcher.submit(["dddd"]),
+        ]
+        results = [f.result(timeout=5) for f in futures]
+        
+        self.assertEqual(embedder.calls, [["a", "bb", "ccc", "dddd"]])
+        self.assertEqual([r[:, 0].tolist() for r in results], [[1], [2, 3], [4]])
+    
+    def test_batches_split_at_max_batch(self):
+        """Test a batch stops growing once max_batch texts are queued."""
+        embedder = RecordingEmbedder()
+        batcher = BatchingEmbedder(embedder, max_batch=2, max_wait=0.05)
+        
+        futures = [batcher.submit([text]) for text in ["a", "b", "c"]]
+        results = [f.result(timeout=5) for f in futures]
+        
+        self.assertEqual(embedder.calls, [["a", "b"], ["c"]])
+        self.assertEqual([r[0, 0] for r in results], [1, 1, 1])
+    
+    def test_concurrent_callers(self):
+        """Test callers on several threads each get their own vectors."""
+        embedder = RecordingEmbedder()
+        batcher = BatchingEmbedder(embedder, max_wait=0.05)
+        results = {}
+        
+        def call(n):
+            results[n] = batcher.embed(["x" * n])
+        
+        threads = [threading.Thread(target=call, args=(n,)) for n in range(1, 9)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual({n: r[0, 0] for n, r in results.items()}, {n: n for n in range(1, 9)})
+        self.assertEqual(sum(len(c) for c in embedder.calls), 8)
+    
+    def test_failure_reaches_every_caller(self):
+        """Test an encode error fails all requests in the batch."""
+        batcher = BatchingEmbedder(RecordingEmbedder(fail=True), max_batch=2, max_wait=5.0)
+        futures = [batcher.submit(["a"]), batcher.submit(["b"])]
+        
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+        
+        # The worker keeps serving after a failure
+        batcher.embedder = RecordingEmbedder()
+        self.assertEqual(batcher.embed(["abc"])[0, 0], 3)
+
+
+class TestThreadBudget(unittest.TestCase):
+    """Test CPU threads are split between gunicorn workers."""
+    
+    def threads(self, cpus, workers=None):
+        env = {} if workers is None else {'EMBED_WORKERS': str(workers)}
+        with mock.patch.dict(os.environ, env), mock.patch('os.cpu_count', return_value=cpus):
+            if workers is None:
+                os.environ.pop('EMBED_WORKERS', None)
+            return _intra_op_threads()
+    
+    def test_single_process_uses_half_the_cores(self):
+        """Test a lone process keeps half the cores."""
+        self.assertEqual(self.threads(8), 4)
+        self.assertEqual(self.threads(8, workers=1), 4)
+    
+    def test_workers_share_the_cores(self):
+        """Test each worker gets an equal share of the cores."""
+        self.assertEqual(self.threads(8, workers=4), 2)
+        self.assertEqual(self.threads(8, workers=2), 4)
+    
+    def test_at_least_one_thread(self):
+        """Test oversubscribed or unknown core counts still get one thread."""
+        self.assertEqual(self.threads(2, workers=4), 1)
+        self.assertEqual(self.threads(None, workers=4), 1)
+
+
+@unittest.skipUnless(HAS_FLASK, "Flask not installed")
+class TestEmbedEndpoint(unittest.TestCase):
+    """Test the OpenAI-compatible HTTP endpoint."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.client = create_app().test_client()
+    
+    def post(self, **payload):
+        response = self.client.post('/v1/embeddings', json=payload)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+    
+    def test_float_response(self):
+        """Test float embeddings are returned in input order."""
+        data = self.post(input=["alpha", "beta"])['data']
+        
+        self.assertEqual([d['index'] for d in data], [0, 1])
+        self.assertEqual(len(data[0]['embedding']), len(data[1]['embedding']))
+        self.assertNotEqual(data[0]['embedding'], data[1]['embedding'])
+    
+    def test_base64_round_trip(self):
+        """Test base64 rows decode to the float32 embeddings."""
+        texts = ["alpha", "beta", "alpha"]
+        floats = self.post(input=texts)['data']
+        encoded = self.post(input=texts, encoding_format='base64')['data']
+        
+        for as_float, as_b64 in zip(floats, encoded):
+            decoded = np.frombuffer(base64.b64decode(as_b64['embedding']), dtype='<f4')
+            np.testing.assert_array_equal(decoded, np.array(as_float['embedding'], dtype=np.float32))
+    
+    def test_single_string_input(self):
+        """Test a bare string is embedded as one text."""
+        data = self.post(input="alpha")['data']
+        
+        self.assertEqual(len(data), 1)
+    
+    def test_non_local_request_rejected(self):
+        """Test requests from other hosts are refused."""
+        response = self.client.post('/embed', json={'input': ["a"]},
+                                    environ_base={'REMOTE_ADDR': '10.0.0.5'})
+        
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -79,7 +79,66 @@ class TestErrorHandler(unittest.TestCase):
         
         recent = self.handler.get_recent_errors(count=5)
         self.assertEqual(len(recent), 5)
+        self.assertEqual(str(recent[0].error), "Error 9")
+        
+        self.handler.handle(error=OSError("disk"), category=ErrorCategory.FILE_IO)
+        recent = self.handler.get_recent_errors(count=5, category=ErrorCategory.FILE_IO)
+        self.assertEqual([str(e.error) for e in recent], ["disk"])
     
+    def test_history_bounded(self):
+        """Test history is capped and counters follow evictions."""
+        handler = ErrorHandler(max_history=3)
+        for i in range(5):
+            handler.handle(
+                error=RuntimeError(f"Error {i}"),
+                category=ErrorCategory.NETWORK if i < 2 else ErrorCategory.DATABASE,
+                severity=ErrorSeverity.WARNING if i < 2 else ErrorSeverity.ERROR
+            )
+        
+        stats = handler.get_error_stats()
+        self.assertEqual(stats['total_errors'], 3)
+        self.assertEqual(stats['by_category'], {ErrorCategory.DATABASE: 3})
+        self.assertEqual(stats['by_severity'], {'error': 3})
+        self.assertEqual(stats['errors_24h'], 3)
+    
+    def test_evicted_context_unchanged(self):
+        """Test contexts evicted from history stay valid for their holders."""
+        handler = ErrorHandler(max_history=1)
+        first = handler.handle(error=RuntimeError("first"), category=ErrorCategory.NETWORK)
+        handler.handle(error=RuntimeError("second"))
+        third = handler.handle(error=RuntimeError("third"))
+        
+        self.assertIsNot(third, first)
+        self.assertEqual(str(first.error), "first")
+        self.assertEqual(first.category, ErrorCategory.NETWORK)
+    
+    def test_handle_many(self):
+        """Test batch handling records every error."""
+        contexts = self.handler.handle_many([
+            (ValueError("a"), ErrorCategory.VALIDATION, ErrorSeverity.WARNING, "test", "op", None),
+            (OSError("b"), ErrorCategory.FILE_IO, ErrorSeverity.ERROR, "test", "op", {'path': 'x'})
+        ])
+        
+        self.assertEqual(len(contexts), 2)
+        self.assertEqual(contexts[1].context_data, {'path': 'x'})
+        stats = self.handler.get_error_stats()
+        self.assertEqual(stats['total_errors'], 2)
+        self.assertEqual(stats['by_severity'], {'warning': 1, 'error': 1})
+    
+    def test_to_dict_labels(self):
+        """Test serialized enums keep their string labels."""
+        ctx = self.handler.handle(
+            error=OSError("disk"),
+            category=ErrorCategory.FILE_IO,
+            severity=ErrorSeverity.WARNING
+        )
+        
+        data = ctx.to_dict()
+        self.assertEqual(data['category'], 'file_io')
+        self.assertEqual(data['severity'], 'warning')
+        self.assertIs(ErrorSeverity(data['severity']), ErrorSeverity.WARNING)
+        self.assertEqual(ErrorCategory.FILE_IO.value, 'file_io')
+
     def test_custom_handler(self):
         """Test custom error handler registration."""
         handled_errors = []
@@ -147,6 +206,18 @@ class TestCircuitBreaker(unittest.TestCase):
         
         self.assertEqual(self.cb.state, CircuitBreakerState.CLOSED)
     
+    def test_failures_expire_from_window(self):
+        """Test old failures stop counting towards the threshold."""
+        cb = CircuitBreaker("window_test", failure_threshold=3, failure_window=0.2)
+        cb.record_failure()
+        cb.record_failure()
+        
+        time.sleep(0.3)
+        cb.record_failure()
+        
+        self.assertEqual(cb.state, CircuitBreakerState.CLOSED)
+        self.assertEqual(cb.get_stats()['failure_count'], 1)
+    
     def test_decorator(self):
         """Test circuit breaker decorator."""
         cb = CircuitBreaker("decorator_test", failure_threshold=2)
@@ -259,6 +330,23 @@ class TestRetryStrategy(unittest.TestCase):
         result = test.decorated_function()
         self.assertEqual(result, "success")
         self.assertEqual(test.call_count, 2)
+    
+    def test_decorator_single_attempt(self):
+        """Test max_attempts=1 calls once and still reports the failure."""
+        handler = ErrorHandler()
+        call_count = 0
+        
+        @with_retry(max_attempts=1, error_handler=handler)
+        def fails():
+            nonlocal call_count
+            call_count += 1
+            raise RuntimeError("boom")
+        
+        with self.assertRaises(RuntimeError):
+            fails()
+        
+        self.assertEqual(call_count, 1)
+        self.assertEqual(handler.get_error_stats()['by_severity'], {'error': 1})
 
 
 class TestValidator(unittest.TestCase):
@@ -452,6 +540,56 @@ class TestHealthMonitor(unittest.TestCase):
         statuses = monitor.check_all()
         self.assertFalse(statuses["failing"].healthy)
         self.assertIn("failed", statuses["failing"].message)
+    
+    def test_results_cached_within_ttl(self):
+        """Test checks are not rerun inside the TTL window."""
+        monitor = HealthMonitor(ttl=60.0)
+        calls = []
+        
+        def check():
+            calls.append(1)
+            return HealthStatus("svc", True, "OK", datetime.utcnow())
+        
+        monitor.register_check("svc", check)
+        monitor.check_all()
+        self.assertTrue(monitor.is_healthy())
+        self.assertEqual(len(calls), 1)
+        
+        monitor.check_all(force=True)
+        self.assertEqual(len(calls), 2)
+    
+    def test_no_caching_by_default(self):
+        """Test checks rerun on every call unless a TTL is given."""
+        monitor = HealthMonitor()
+        calls = []
+        
+        def check():
+            calls.append(1)
+            return HealthStatus("svc", True, "OK", datetime.utcnow())
+        
+        monitor.register_check("svc", check)
+        monitor.check_all()
+        monitor.check_all()
+        self.assertTrue(monitor.is_healthy())
+        self.assertEqual(len(calls), 3)
+    
+    def test_is_healthy_stops_at_first_failure(self):
+        """Test checks after the first unhealthy one are not run."""
+        monitor = HealthMonitor()
+        calls = []
+        
+        def check(name, healthy):
+            def run():
+                calls.append(name)
+                return HealthStatus(name, healthy, "", datetime.utcnow())
+            return run
+        
+        monitor.register_check("up", check("up", True))
+        monitor.register_check("down", check("down", False))
+        monitor.register_check("later", check("later", True))
+        
+        self.assertFalse(monitor.is_healthy())
+        self.assertEqual(calls, ["up", "down"])
 
 
 class TestIntegration(unittest.TestCase):
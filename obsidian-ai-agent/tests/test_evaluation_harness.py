@@ -0,0 +1,171 @@
+"""
+Unit tests for the RAG evaluation harness
+"""
+
+import gc
+import json
+import os
+import tempfile
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "local-ai-stack" / "ai_stack"))
+
+from evaluation_harness import FeedbackLoop, HallucinationDetector
+
+
+class TestContradictionDetection(unittest.TestCase):
+    """Test detection of responses negating their context."""
+    
+    def setUp(self):
+        self.detector = HallucinationDetector()
+    
+    def contradictions(self, response, context):
+        return [
+            issue for issue in self.detector.detect(response, context)['issues']
+            if issue.startswith("Possible contradiction")
+        ]
+    
+    def test_negated_statement(self):
+        """Test a negated context statement is reported."""
+        issues = self.contradictions("Python is not popular.", "Python is popular.")
+        self.assertIn("Possible contradiction regarding 'popular'", issues)
+    
+    def test_consistent_statement(self):
+        """Test agreeing responses report nothing."""
+        self.assertEqual(self.contradictions("Python is popular.", "Python is popular."), [])
+    
+    def test_case_insensitive(self):
+        """Test negations match regardless of case."""
+        issues = self.contradictions("PYTHON IS NOT POPULAR", "python is popular")
+        self.assertIn("Possible contradiction regarding 'popular'", issues)
+    
+    def test_each_context_chunk_checked(self):
+        """Test every retrieved chunk is checked."""
+        issues = self.contradictions(
+            "Rust is not fast.",
+            ["Go is simple.", "Rust is fast."]
+        )
+        self.assertIn("Possible contradiction regarding 'fast'", issues)
+    
+    def test_unicode_case_folding(self):
+        """Test non-ASCII text folds case the way regex matching does."""
+        self.assertIn(
+            "Possible contradiction regarding 'it'",
+            self.contradictions("İt is not here", "the it is fine")
+        )
+        self.assertIn(
+            "Possible contradiction regarding 'sun'",
+            self.contradictions("ſun is not hot", "sun is")
+        )
+
+
+class TestFeedbackLoopFile(unittest.TestCase):
+    """Test the feedback file handle is released."""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+    
+    def test_context_manager_closes_file(self):
+        """Test leaving the with block closes the handle."""
+        with FeedbackLoop(self.tmpdir.name) as loop:
+            loop.collect_feedback("q", "r", 5)
+            handle = loop._feedback_file
+            self.assertFalse(handle.closed)
+        
+        self.assertTrue(handle.closed)
+        self.assertIsNone(loop._feedback_file)
+    
+    def test_close_is_idempotent(self):
+        """Test close() can be called repeatedly and before any write."""
+        loop = FeedbackLoop(self.tmpdir.name)
+        loop.close()
+        loop.collect_feedback("q", "r", 4)
+        loop.close()
+        loop.close()
+        
+        self.assertEqual(len(loop.feedback_history), 1)
+    
+    def test_dropped_loop_closes_file(self):
+        """Test the finalizer closes the handle of an unclosed loop."""
+        loop = FeedbackLoop(self.tmpdir.name)
+        loop.collect_feedback("q", "r", 3)
+        handle = loop._feedback_file
+        
+        del loop
+        gc.collect()
+        self.assertTrue(handle.closed)
+
+    
+    def read_records(self):
+        (name,) = os.listdir(self.tmpdir.name)
+        with open(os.path.join(self.tmpdir.name, name), encoding='utf-8') as f:
+            return f.read().splitlines()
+    
+    def test_records_match_json_dumps(self):
+        """Test records are written as json.dumps would write them."""
+        metrics = {'faithfulness': 0.75, 1: 'int key', 'nested': {2: [0.5, float('inf')]}}
+        with FeedbackLoop(self.tmpdir.name) as loop:
+            loop.collect_feedback("q", "r", 4, evaluation_metrics={'score': 0.5, 3: 'x'})
+            loop.collect_feedback("q", "r", 2, evaluation_metrics=metrics)
+            loop.collect_feedback("q", "r", 1, evaluation_metrics={'score': float('nan')})
+            expected = [json.loads(json.dumps(fb)) for fb in loop.feedback_history]
+        
+        lines = self.read_records()
+        self.assertEqual(json.loads(lines[0]), expected[0])
+        self.assertEqual(json.loads(lines[0])['auto_metrics'], {'score': 0.5, '3': 'x'})
+        self.assertIn('Infinity', lines[1])
+        self.assertEqual(json.loads(lines[1])['auto_metrics']['1'], 'int key')
+        self.assertIn('"score": NaN', lines[2])
+
+
+class TestFeedbackInsights(unittest.TestCase):
+    """Test insights track the feedback history."""
+    
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.loop = FeedbackLoop(tmpdir.name)
+        self.addCleanup(self.loop.close)
+    
+    def test_incremental_insights(self):
+        """Test feedback added between calls is included."""
+        self.loop.collect_feedback("q", "r", 5)
+        self.assertEqual(self.loop.get_insights()['average_rating'], 5)
+        
+        self.loop.collect_feedback("q", "r", 1, "The answer was wrong")
+        insights = self.loop.get_insights()
+        self.assertEqual(insights['average_rating'], 3)
+        self.assertEqual(insights['common_issues'], ["incorrect_info (1 times)"])
+    
+    def test_truncated_history_rescanned(self):
+        """Test aggregates are rebuilt after the history shrinks."""
+        for rating in (1, 2, 3):
+            self.loop.collect_feedback("q", "r", rating, "wrong")
+        self.loop.get_insights()
+        
+        del self.loop.feedback_history[:2]
+        self.loop.collect_feedback("q", "r", 5)
+        insights = self.loop.get_insights()
+        
+        self.assertEqual(insights['total_feedback'], 2)
+        self.assertEqual(insights['average_rating'], 4)
+        self.assertEqual(insights['rating_distribution']['1'], 0)
+        self.assertEqual(insights['common_issues'], ["incorrect_info (1 times)"])
+    
+    def test_replaced_history_rescanned(self):
+        """Test aggregates are rebuilt when the history list is swapped out."""
+        for rating in (1, 1):
+            self.loop.collect_feedback("q", "r", rating)
+        self.loop.get_insights()
+        
+        self.loop.feedback_history = [
+            dict(fb, user_rating=5) for fb in self.loop.feedback_history
+        ]
+        self.assertEqual(self.loop.get_insights()['average_rating'], 5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
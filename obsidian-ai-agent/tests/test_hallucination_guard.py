@@ -0,0 +1,114 @@
+"""
+Unit tests for the Hallucination Reduction System
+"""
+
+import unittest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / "local-ai-stack" / "ai_stack"))
+
+from hallucination_guard import (
+    HallucinationReductionSystem,
+    BaseValidator,
+    StructureValidator,
+    ValidationResult
+)
+
+
+SOURCE = (
+    "Docker was released in 2013 by Docker, Inc. It is a popular containerization "
+    "platform. Kubernetes was originally designed by Google and released in 2014."
+)
+
+GENERATED = (
+    "Docker was released in 2013 by Docker, Inc. According to the documentation, "
+    "Kubernetes was designed by Google and released in 2014."
+)
+
+
+class FixedScoreValidator(BaseValidator):
+    """Validator returning a constant score."""
+    
+    def __init__(self, name: str = "FixedScore", score: float = 1.0):
+        super().__init__(name, threshold=0.0)
+        self.score = score
+    
+    def validate(self, generated, source=None):
+        return ValidationResult(
+            validator_name=self.name,
+            score=self.score,
+            passed=True,
+            details={},
+            suggestions=[]
+        )
+
+
+class TestValidatorWeighting(unittest.TestCase):
+    """Test overall score weighting and the result cache."""
+    
+    def setUp(self):
+        self.guard = HallucinationReductionSystem()
+    
+    def test_result_per_validator(self):
+        """Test every validator reports a result."""
+        result = self.guard.validate(GENERATED, SOURCE)
+        
+        names = [r['name'] for r in result['validator_results']]
+        self.assertEqual(names, [v.name for v in self.guard.validators])
+        self.assertGreaterEqual(result['overall_score'], 0.0)
+        self.assertLessEqual(result['overall_score'], 1.0)
+    
+    def test_validator_added_after_construction(self):
+        """Test validators appended later are weighted and invalidate the cache."""
+        before = self.guard.validate(GENERATED, SOURCE)
+        
+        self.guard.validators.append(FixedScoreValidator(score=1.0))
+        after = self.guard.validate(GENERATED, SOURCE)
+        
+        self.assertEqual(len(after['validator_results']), len(before['validator_results']) + 1)
+        # Unknown validators count with the default 0.1 weight
+        self.assertAlmostEqual(after['overall_score'], before['overall_score'] + 0.1, places=2)
+    
+    def test_validate_only_subclasses(self):
+        """Test validators implementing only validate() still work."""
+        validator = FixedScoreValidator(score=0.5)
+        self.assertEqual(validator.validate(GENERATED, SOURCE).score, 0.5)
+        
+        self.guard.validators = [validator]
+        result = self.guard.validate(GENERATED, SOURCE)
+        self.assertEqual(result['validator_results'][0]['score'], 0.5)
+    
+    def test_subclass_validate_override_is_used(self):
+        """Test overriding validate() on a built-in validator takes effect."""
+        class StrictStructure(StructureValidator):
+            def validate(self, generated, source=None):
+                return ValidationResult(self.name, 0.0, False, {}, ["strict"])
+        
+        self.guard.validators = [
+            StrictStructure() if isinstance(v, StructureValidator) else v
+            for v in self.guard.validators
+        ]
+        result = self.guard.validate(GENERATED, SOURCE)
+        self.assertIn("strict", result['suggestions'])
+    
+    def test_cached_result_is_a_copy(self):
+        """Test repeated validations are served from cache without sharing state."""
+        first = self.guard.validate(GENERATED, SOURCE)
+        first['suggestions'].append("mutated")
+        second = self.guard.validate(GENERATED, SOURCE)
+        
+        self.assertNotIn("mutated", second['suggestions'])
+        self.assertEqual(first['overall_score'], second['overall_score'])
+        self.assertEqual(len(self.guard._cache), 1)
+    
+    def test_cache_disabled(self):
+        """Test a zero-size cache stores nothing."""
+        guard = HallucinationReductionSystem(cache_size=0)
+        guard.validate(GENERATED, SOURCE)
+        
+        self.assertEqual(len(guard._cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -2,6 +2,7 @@
 Unit tests for Incremental Indexer (Issue #95)
 """
 
+import os
 import unittest
 import tempfile
 import shutil
@@ -13,6 +14,7 @@ import sqlite3
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "local-ai-stack" / "ai_stack"))
 
+import incremental_indexer
 from incremental_indexer import (
     IncrementalIndexer, 
     ChangeTracker, 
@@ -109,6 +111,44 @@ class TestChangeTracker(unittest.TestCase):
         
         # Non-existent key
         self.assertIsNone(self.tracker.get_metadata("non_existent"))
+    
+    def test_legacy_schema_migration(self):
+        """Test stat columns are added to databases created without them."""
+        legacy_path = Path(self.temp_dir) / "legacy.db"
+        conn = sqlite3.connect(str(legacy_path))
+        conn.execute("""
+            CREATE TABLE index_state (
+                note_id TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                last_modified TIMESTAMP NOT NULL,
+                embedding_id TEXT,
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                word_count INTEGER DEFAULT 0,
+                link_count INTEGER DEFAULT 0,
+                tags TEXT DEFAULT '[]'
+            )
+        """)
+        conn.execute(
+            "INSERT INTO index_state (note_id, file_path, content_hash, last_modified, indexed_at) "
+            "VALUES ('old.md', 'old.md', 'abc', ?, ?)",
+            (datetime.utcnow().isoformat(), datetime.utcnow().isoformat())
+        )
+        conn.commit()
+        conn.close()
+        
+        entry = ChangeTracker(str(legacy_path)).get_entry("old.md")
+        self.assertEqual(entry.file_size, 0)
+        self.assertEqual(entry.mtime_ns, 0)
+    
+    def test_connection_uses_wal(self):
+        """Test connections are opened in WAL mode."""
+        with self.tracker._get_connection() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            sync = conn.execute("PRAGMA synchronous").fetchone()[0]
+        
+        self.assertEqual(mode, "wal")
+        self.assertEqual(sync, 1)  # NORMAL
 
 
 class TestIncrementalIndexer(unittest.TestCase):
@@ -128,11 +168,14 @@ class TestIncrementalIndexer(unittest.TestCase):
     def tearDown(self):
         shutil.rmtree(self.temp_dir, ignore_errors=True)
     
-    def create_note(self, path: str, content: str):
-        """Helper to create a test note."""
+    def create_note(self, path: str, content: str, age: float = 0):
+        """Helper to create a test note, optionally modified age seconds ago."""
         note_path = self.vault_path / path
         note_path.parent.mkdir(parents=True, exist_ok=True)
         note_path.write_text(content, encoding='utf-8')
+        if age:
+            mtime = time.time() - age
+            os.utime(note_path, (mtime, mtime))
         return note_path
     
     def test_detect_new_files(self):
@@ -193,6 +236,20 @@ class TestIncrementalIndexer(unittest.TestCase):
         self.assertEqual(len(report.unchanged), 1)
         self.assertFalse(report.has_changes)
     
+    def test_unchanged_stat_skips_read(self):
+        """Test files with matching size and mtime are not re-read."""
+        self.create_note("note1.md", "# Test", age=60)
+        self.indexer.index_changes()
+        
+        reads = []
+        original_read = self.indexer._read_note_bytes
+        self.indexer._read_note_bytes = lambda path: reads.append(path) or original_read(path)
+        
+        report = self.indexer.detect_changes()
+        
+        self.assertEqual(report.unchanged, ["note1.md"])
+        self.assertEqual(reads, [])
+    
     def test_incremental_indexing(self):
         """Test full incremental indexing workflow."""
         # Initial indexing
@@ -230,6 +287,116 @@ Here's a [[link]] and [external](http://example.com).
         self.assertIn("tag1", entry.tags)
         self.assertIn("tag2", entry.tags)
     
+    def test_legacy_rows_reach_fast_path(self):
+        """Test rows without stat columns stop being re-read after one scan."""
+        content = "# Legacy\n\nIndexed before stat tracking."
+        self.create_note("note1.md", content, age=60)
+        
+        legacy_db = Path(self.temp_dir) / "legacy.db"
+        conn = sqlite3.connect(str(legacy_db))
+        conn.execute("""
+            CREATE TABLE index_state (
+                note_id TEXT PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                last_modified TIMESTAMP NOT NULL,
+                embedding_id TEXT,
+                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                word_count INTEGER DEFAULT 0,
+                link_count INTEGER DEFAULT 0,
+                tags TEXT DEFAULT '[]'
+            )
+        """)
+        conn.execute(
+            "INSERT INTO index_state (note_id, file_path, content_hash, last_modified, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                "note1.md", str(self.vault_path / "note1.md"),
+                ChangeTracker.compute_hash(content),
+                datetime.utcnow().isoformat(), datetime.utcnow().isoformat()
+            )
+        )
+        conn.commit()
+        conn.close()
+        
+        indexer = IncrementalIndexer(str(self.vault_path), str(legacy_db))
+        first = indexer.detect_changes()
+        self.assertEqual(first.unchanged, ["note1.md"])
+        
+        reads = []
+        original_read = indexer._read_note_bytes
+        indexer._read_note_bytes = lambda path: reads.append(path) or original_read(path)
+        
+        second = indexer.detect_changes()
+        self.assertEqual(second.unchanged, ["note1.md"])
+        self.assertEqual(reads, [])
+    
+    def test_racy_same_size_edit_detected(self):
+        """Test a same-size edit within one mtime tick of indexing is caught."""
+        note_path = self.create_note("note1.md", "# Version A")
+        self.indexer.index_changes()
+        stat = note_path.stat()
+        
+        # Same size, and the mtime did not advance (coarse timestamps)
+        note_path.write_text("# Version B", encoding='utf-8')
+        os.utime(note_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        
+        report = self.indexer.detect_changes()
+        self.assertEqual([e.note_id for e in report.modified], ["note1.md"])
+    
+    def test_racy_stat_not_stored(self):
+        """Test recently modified notes only reach the fast path once settled."""
+        note_path = self.create_note("note1.md", "# Test")
+        self.indexer.index_changes()
+        self.assertEqual(self.indexer.tracker.get_entry("note1.md").mtime_ns, 0)
+        
+        old = time.time() - 60
+        os.utime(note_path, (old, old))
+        report = self.indexer.detect_changes()
+        
+        self.assertEqual(report.unchanged, ["note1.md"])
+        self.assertEqual(
+            self.indexer.tracker.get_entry("note1.md").mtime_ns,
+            note_path.stat().st_mtime_ns
+        )
+    
+    def test_full_reindex_skips_racy_stats(self):
+        """Test a full reindex stores no stat for recently modified notes."""
+        self.create_note("fresh.md", "# Fresh")
+        old_path = self.create_note("old.md", "# Old", age=60)
+        self.indexer.full_reindex()
+        
+        self.assertEqual(self.indexer.tracker.get_entry("fresh.md").mtime_ns, 0)
+        self.assertEqual(
+            self.indexer.tracker.get_entry("old.md").mtime_ns,
+            old_path.stat().st_mtime_ns
+        )
+    
+    def test_parallel_detection_matches_serial(self):
+        """Test threaded change detection finds the same changes."""
+        for i in range(10):
+            self.create_note(f"note{i}.md", f"# Note {i}\n\nSee [[note{i + 1}]] #tag{i}")
+        self.indexer.index_changes()
+        
+        time.sleep(0.1)
+        for i in range(0, 10, 2):
+            self.create_note(f"note{i}.md", f"# Note {i}\n\nRewritten #new")
+        self.create_note("extra.md", "# Extra")
+        
+        reports = []
+        for workers in (1, 4):
+            indexer = IncrementalIndexer(str(self.vault_path), str(self.db_path), max_workers=workers)
+            reports.append(indexer.detect_changes())
+        
+        serial, parallel = reports
+        self.assertEqual(len(parallel.modified), 5)
+        for field in ('added', 'modified'):
+            self.assertEqual(
+                sorted((e.note_id, e.content_hash, e.tags) for e in getattr(serial, field)),
+                sorted((e.note_id, e.content_hash, e.tags) for e in getattr(parallel, field))
+            )
+        self.assertEqual(sorted(serial.unchanged), sorted(parallel.unchanged))
+    
     def test_full_reindex(self):
         """Test full reindex functionality."""
         self.create_note("note1.md", "# Test 1")
@@ -263,6 +430,55 @@ Here's a [[link]] and [external](http://example.com).
         self.assertEqual(len(embedding_calls), 1)
         self.assertEqual(embedding_calls[0][0], "note1.md")
     
+    def test_embedding_reuses_detected_content(self):
+        """Test detected notes are embedded without a second read."""
+        embedding_calls = []
+        
+        def mock_embedder(note_id: str, content: str) -> str:
+            embedding_calls.append((note_id, content))
+            return f"embedding_{note_id}"
+        
+        indexer_with_embedder = IncrementalIndexer(
+            str(self.vault_path),
+            str(self.db_path).replace(".db", "_embed.db"),
+            embedding_callback=mock_embedder
+        )
+        
+        note_path = self.vault_path / "note1.md"
+        note_path.write_bytes(b"# Test\r\n\r\nWindows line endings.")
+        report = indexer_with_embedder.detect_changes()
+        
+        reads = []
+        indexer_with_embedder._read_note_bytes = lambda path: reads.append(path)
+        indexer_with_embedder.index_changes(report)
+        
+        self.assertEqual(reads, [])
+        self.assertEqual(embedding_calls, [("note1.md", "# Test\n\nWindows line endings.")])
+        self.assertEqual(indexer_with_embedder._pending_content, {})
+    
+    def test_pending_content_capped(self):
+        """Test kept note text stops at the size cap and is re-read instead."""
+        embedding_calls = []
+        indexer_with_embedder = IncrementalIndexer(
+            str(self.vault_path),
+            str(self.db_path).replace(".db", "_embed.db"),
+            embedding_callback=lambda note_id, content: embedding_calls.append(note_id) or note_id
+        )
+        self.create_note("small.md", "x" * 10)
+        self.create_note("large.md", "y" * 100)
+        
+        original_limit = incremental_indexer.PENDING_CONTENT_LIMIT
+        incremental_indexer.PENDING_CONTENT_LIMIT = 50
+        try:
+            report = indexer_with_embedder.detect_changes()
+        finally:
+            incremental_indexer.PENDING_CONTENT_LIMIT = original_limit
+        
+        self.assertEqual(list(indexer_with_embedder._pending_content), ["small.md"])
+        indexer_with_embedder.index_changes(report)
+        self.assertEqual(sorted(embedding_calls), ["large.md", "small.md"])
+        self.assertEqual(indexer_with_embedder._pending_content, {})
+    
     def test_nested_directories(self):
         """Test indexing nested directory structures."""
         self.create_note("folder1/note1.md", "# Nested 1")